@@ -1 +1 @@
-from nython.core.runtime.flow import Flow
\ No newline at end of file
+from nython.core.runtime.flow import Flow, FlowCycleError
\ No newline at end of file
@@ -1,37 +1,156 @@
-from nython.core.ui.editor import NodeEditor
-from nython.core.ui.theming import get_theme, load_font
+import argparse
+import sys
 
-from inspect import getsourcefile
-from os.path import abspath
 
-from pathlib import Path
-import os
+def run_flows(paths: list[str], parallel: bool = False, workers: int | None = None,
+              processes: bool = False, use_async: bool = False, concurrency: int | None = None,
+              verbose: bool = False, trace: str | None = None, isolated: bool = False,
+              timeout: float | None = None, memory_limit: int | None = None,
+              shared_memory: bool = False, fuse: bool = False, prune: bool = False) -> int:
+    """Run flow files one after another in this process, return an exit code."""
+    # only the runtime is imported, the editor and DearPyGui are never loaded
+    from nython.core.runtime.flow import Flow
+    from nython.core.runtime.profiling import PrintHook, Profiler
 
-import dearpygui.dearpygui as dpg
+    hooks = []
+    if verbose:
+        hooks.append(PrintHook())
+    profiler = Profiler(memory=True) if trace else None
+    if profiler is not None:
+        hooks.append(profiler)
 
-# Redirect all print statements to a log file
-log_file = open("app.log", "a")
-# sys.stdout = log_file
+    pool = None
+    if isolated:
+        from nython.core.runtime.workers import WorkerPool
+        pool = WorkerPool(workers, timeout=timeout, memory_limit=memory_limit)
 
-dpg.create_context()
-dpg.configure_app(docking=False, docking_space=False)
-dpg.create_viewport(title='Nython Editor', width=1280, height=720, decorated=True)
+    plane = None
+    if shared_memory:
+        from nython.core.runtime.dataplane import DataPlane
+        plane = DataPlane()
 
-# Import path for font file
-path = os.path.dirname(abspath(getsourcefile(lambda:0))) + "/res/OpenSans-Regular.ttf"
-example_path = os.path.dirname(abspath(getsourcefile(lambda:0))) + "/_examples/flow.json"
+    status = 0
+    try:
+        for path in paths:
+            try:
+                flow = Flow.load(path)
+                flow.hooks.extend(hooks)
+                if use_async:
+                    import asyncio
+                    asyncio.run(flow.arun(concurrency=concurrency, release=prune, prune=prune))
+                else:
+                    flow.run(parallel=parallel, workers=workers, processes=processes, pool=pool, plane=plane,
+                             release=plane is not None or prune, fuse=fuse, prune=prune)
+                for conflict in flow.conflicts:
+                    print(f"{path}: warning: {conflict}", file=sys.stderr)
+            except Exception as err:
+                print(f"{path}: {type(err).__name__}: {err}", file=sys.stderr)
+                status = 1
+    finally:
+        if pool is not None:
+            pool.close()
+        if plane is not None:
+            plane.close()
 
-print("Import font from", path)
+    if profiler is not None and trace is not None:
+        profiler.export_chrome_trace(trace)
 
-load_font(path)
+    return status
 
-with NodeEditor(example_path) as editor:
-    theme = get_theme()
-    dpg.bind_theme(theme)
 
-    dpg.set_primary_window(editor.window_tag, True)
+def sweep_flow(path: str, params: str, workers: int | None = None, outputs: list[str] | None = None,
+               inline: bool = False, fuse: bool = False, prune: bool = False) -> int:
+    """Run a flow once per JSON object in the `params` file, print one JSON line per finished run."""
+    import json
 
-dpg.setup_dearpygui()
-dpg.show_viewport()
-dpg.start_dearpygui()
-dpg.destroy_context()
\ No newline at end of file
+    from nython.core.runtime.sweep import sweep
+
+    def read_params(file):
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+    status = 0
+    file = sys.stdin if params == "-" else open(params)
+    try:
+        for result in sweep(path, read_params(file), workers, outputs, processes=not inline, fuse=fuse, prune=prune):
+            if result.ok:
+                line = {"index": result.index, "params": result.params, "values": result.values}
+            else:
+                line = {"index": result.index, "params": result.params, "error": result.error}
+                status = 1
+            # values JSON does not know are written as their repr
+            print(json.dumps(line, default=repr), flush=True)
+    except Exception as err:
+        print(f"{path}: {type(err).__name__}: {err}", file=sys.stderr)
+        return 1
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    return status
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="nython", description="Node based editor and runtime for python")
+    commands = parser.add_subparsers(dest="command")
+
+    edit = commands.add_parser("edit", help="open a flow in the editor (default)")
+    edit.add_argument("flow", nargs="?", help="flow file, defaults to the bundled example")
+
+    run = commands.add_parser("run", help="execute flow files headless")
+    run.add_argument("flows", nargs="+", help="flow files, executed in order in one process")
+    run.add_argument("--parallel", action="store_true", help="run independent branches concurrently")
+    run.add_argument("--workers", type=int, default=None, help="pool size for --parallel")
+    run.add_argument("--processes", action="store_true", help="use a process pool for --parallel")
+    run.add_argument("--async", dest="use_async", action="store_true", help="run on an event loop, allows top-level await")
+    run.add_argument("--concurrency", type=int, default=None, help="maximum of concurrently awaiting nodes for --async")
+    run.add_argument("-v", "--verbose", action="store_true", help="print a line for every executed node")
+    run.add_argument("--trace", help="profile the nodes and write a Chrome trace event file")
+    run.add_argument("--isolated", action="store_true", help="execute nodes in a pool of warm worker processes")
+    run.add_argument("--timeout", type=float, default=None, help="seconds per node for --isolated")
+    run.add_argument("--memory-limit", type=int, default=None, help="megabytes per worker for --isolated")
+    run.add_argument("--shared-memory", action="store_true",
+                     help="pass large buffers to worker processes through shared memory")
+    run.add_argument("--fuse", action="store_true", help="execute linear chains of nodes as one code object")
+    run.add_argument("--prune", action="store_true",
+                     help="pass nodes only the names they read and free unread values early")
+
+    sweep = commands.add_parser("sweep", help="run a flow once per parameter set, headless")
+    sweep.add_argument("flow", help="flow file, loaded and planned once")
+    sweep.add_argument("params", help="JSON lines file with one object of root node inputs per run, - for stdin")
+    sweep.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the CPU count")
+    sweep.add_argument("--outputs", nargs="+", default=None, help="names to report from the sink nodes")
+    sweep.add_argument("--inline", action="store_true", help="run in this process instead of worker processes")
+    sweep.add_argument("--fuse", action="store_true", help="execute linear chains of nodes as one code object")
+    sweep.add_argument("--prune", action="store_true", help="pass nodes only the names they read")
+
+    convert = commands.add_parser("convert", help="convert a flow between the JSON and the binary format")
+    convert.add_argument("source", help="flow file, JSON or binary")
+    convert.add_argument("target", help="output file in the other format")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        from nython.core.runtime.binformat import convert as convert_flow
+        convert_flow(args.source, args.target)
+        return 0
+
+    if args.command == "sweep":
+        return sweep_flow(args.flow, args.params, args.workers, args.outputs, args.inline, args.fuse, args.prune)
+
+    if args.command == "run":
+        if args.fuse and (args.parallel or args.isolated):
+            parser.error("--fuse cannot be combined with --parallel or --isolated")
+        return run_flows(args.flows, args.parallel, args.workers, args.processes, args.use_async, args.concurrency,
+                         args.verbose, args.trace, args.isolated, args.timeout,
+                         args.memory_limit * 2**20 if args.memory_limit else None, args.shared_memory, args.fuse,
+                         args.prune)
+
+    # GUI imports stay lazy so the headless path starts without a display
+    from nython.core.ui.app import launch
+    launch(getattr(args, "flow", None))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Benchmarks for the runtime on synthetic flows.
+
+    python -m nython.bench [--scale 1.0] [--repeat 3] [--output results.json]
+
+Flows of several shapes are generated in memory and the main `Flow`
+operations are timed on them. Results are printed (or written) as JSON so
+runs of different commits can be compared. Only the runtime is imported,
+DearPyGui is not needed.
+"""
+from typing import Callable, Iterator
+
+from nython.core.runtime.connector import Connector, ConnectorType
+from nython.core.runtime.flow import Flow
+from nython.core.runtime.node import NodeData
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+class _Ids:
+    def __init__(self, start: int = 1) -> None:
+        self.next = start
+
+    def __call__(self) -> int:
+        value = self.next
+        self.next += 1
+        return value
+
+
+def _node(ids: _Ids, code: str, title: str) -> NodeData:
+    node = NodeData(ids(), code)
+    node.title = title
+
+    in_conn = Connector(ids())
+    in_conn.type = ConnectorType.INPUT
+    out_conn = Connector(ids())
+    out_conn.type = ConnectorType.OUTPUT
+
+    node.inputs = [in_conn]
+    node.outputs = [out_conn]
+    return node
+
+
+def _link(flow: Flow, source: NodeData, target: NodeData):
+    flow.connect(source.outputs[0].uuid, target.inputs[0].uuid)
+
+
+def chain(n: int) -> Flow:
+    """n nodes, each one linked to the next."""
+    ids, flow = _Ids(), Flow()
+    prev = None
+    for i in range(n):
+        node = _node(ids, f"x{i % 16} = {i}", f"chain {i}")
+        flow.add_node(node)
+        if prev is not None:
+            _link(flow, prev, node)
+        prev = node
+    return flow
+
+
+def fan(n: int) -> Flow:
+    """One source feeding n independent nodes that all feed one sink."""
+    ids, flow = _Ids(), Flow()
+    source = _node(ids, "base = 1", "source")
+    sink = _node(ids, "done = True", "sink")
+    flow.add_node(source)
+
+    for i in range(n):
+        node = _node(ids, f"v{i % 16} = base + {i}", f"branch {i}")
+        flow.add_node(node)
+        _link(flow, source, node)
+
+    flow.add_node(sink)
+    for node in flow._nodes[1:-1]:
+        _link(flow, node, sink)
+    return flow
+
+
+def random_dag(n: int, degree: int = 3, seed: int = 0) -> Flow:
+    """n nodes, each linked from up to `degree` random earlier nodes."""
+    rng = random.Random(seed)
+    ids, flow = _Ids(), Flow()
+    nodes: list[NodeData] = []
+    for i in range(n):
+        node = _node(ids, f"y{i % 16} = {i}", f"dag {i}")
+        flow.add_node(node)
+        if nodes:
+            for source in rng.sample(nodes, min(len(nodes), rng.randint(1, degree))):
+                _link(flow, source, node)
+        nodes.append(node)
+    return flow
+
+
+def wide_namespace(n: int, names: int = 1000) -> Flow:
+    """A chain of n nodes, each defining `names` new variables."""
+    ids, flow = _Ids(), Flow()
+    prev = None
+    for i in range(n):
+        code = "\n".join(f"n{i}_{j} = {j}" for j in range(names))
+        node = _node(ids, code, f"wide {i}")
+        flow.add_node(node)
+        if prev is not None:
+            _link(flow, prev, node)
+        prev = node
+    return flow
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _bench_shape(name: str, build: Callable[[], Flow], repeat: int, tmp: str) -> Iterator[dict]:
+    start = time.perf_counter()
+    flow = build()
+    nodes = len(flow._nodes)
+    yield {"shape": name, "nodes": nodes, "op": "build", "seconds": time.perf_counter() - start}
+
+    def result(op: str, seconds: float, **extra) -> dict:
+        return {"shape": name, "nodes": nodes, "op": op, "seconds": seconds, **extra}
+
+    for suffix, label in ((".json", "json"), (".nyb", "binary")):
+        path = os.path.join(tmp, name + suffix)
+        yield result(f"save_{label}", _timed(lambda: flow.save(path), repeat))
+        yield result(f"load_{label}", _timed(lambda: Flow.load(path, recover=False), repeat))
+
+    # relink every edge once
+    pairs = [tuple(pair) for pair in flow._edges]
+
+    def relink():
+        for a, b in pairs:
+            flow.disconnect(a, b)
+        for a, b in pairs:
+            flow.connect(a, b)
+
+    yield result("disconnect_connect", _timed(relink, repeat), edges=len(pairs))
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield result("run", _timed(flow.run, repeat))
+        yield result("run_fused", _timed(lambda: flow.run(fuse=True), repeat))
+
+    # removing nodes mutates the flow, so this comes last and runs once
+    victims = flow._nodes[::10]
+    start = time.perf_counter()
+    for node in victims:
+        flow.remove_node(node)
+    yield result("remove_node", time.perf_counter() - start, removed=len(victims))
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_benchmarks(scale: float = 1.0, repeat: int = 3, shapes: list[str] | None = None) -> dict:
+    size = lambda n: max(2, int(n * scale))
+    builders: dict[str, Callable[[], Flow]] = {
+        "chain": lambda: chain(size(10_000)),
+        "fan": lambda: fan(size(1_000)),
+        "random_dag": lambda: random_dag(size(10_000)),
+        "wide_namespace": lambda: wide_namespace(size(200), names=1_000),
+    }
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, build in builders.items():
+            if shapes and name not in shapes:
+                continue
+            results.extend(_bench_shape(name, build, repeat, tmp))
+
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m nython.bench", description="Benchmark the nython runtime")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the flow sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per measurement, the best is reported")
+    parser.add_argument("--shape", action="append", dest="shapes", help="only run this shape (repeatable)")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.scale, args.repeat, args.shapes)
+    text = json.dumps(report, indent=4)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
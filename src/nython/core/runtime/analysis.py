@@ -0,0 +1,162 @@
+"""
+Static analysis of the names a node's code reads and writes.
+
+The sets are conservative: a name counts as read if the code refers to it
+anywhere, including `x += 1` and `del x`, also inside functions and classes
+where it is resolved as a global, and as written if it is bound at the top level or declared
+`global`. `upstream` narrows the reads down to names that may be read
+before the code binds them itself. Code that can reach names the analysis cannot see (`eval`,
+`exec`, `globals()`, `locals()`, `vars()`, `dir()` or `import *`) is marked
+dynamic and gets every name.
+"""
+from typing import TYPE_CHECKING
+
+from collections import OrderedDict
+
+import ast
+import symtable
+import threading
+
+if TYPE_CHECKING:
+    from nython.core.runtime.node import NodeData
+
+# Einträge im Cache, jeweils pro Code-Hash
+MAX_ENTRIES = 4096
+
+_DYNAMIC = frozenset({"eval", "exec", "globals", "locals", "vars", "dir"})
+
+
+class NodeSymbols:
+    """Names read and written by a node's code."""
+
+    def __init__(self, reads: frozenset[str], writes: frozenset[str], dynamic: bool = False,
+                 upstream: frozenset[str] | None = None) -> None:
+        self.reads: frozenset[str] = reads
+        self.writes: frozenset[str] = writes
+        self.dynamic: bool = dynamic
+
+        # reads that may happen before an own binding, i.e. see an upstream value
+        self.upstream: frozenset[str] = reads if upstream is None else upstream
+
+    def __repr__(self) -> str:
+        return f"NodeSymbols(reads={sorted(self.reads)}, writes={sorted(self.writes)}, dynamic={self.dynamic})"
+
+
+class Conflict:
+    """A name a node reads that several of its predecessors provide with different values."""
+
+    def __init__(self, node: "NodeData", name: str, sources: list["NodeData"]) -> None:
+        self.node: "NodeData" = node
+        self.name: str = name
+        self.sources: list["NodeData"] = sources
+
+    def __str__(self) -> str:
+        sources = ", ".join(f"{n.title} ({n.uuid})" for n in self.sources)
+        return (f"{self.name!r} read by {self.node.title} ({self.node.uuid}) differs between "
+                f"{sources}; the value of {self.sources[0].title} is used")
+
+    def __repr__(self) -> str:
+        return f"Conflict({self.name!r}, {self.node.uuid}, {[n.uuid for n in self.sources]})"
+
+
+def _scan(tree: ast.Module) -> tuple[set[str], bool]:
+    # symtable does not count `x += 1` and `del x` as references although
+    # both need the value, and cannot tell about `import *`
+    reads: set[str] = set()
+    star = False
+    for n in ast.walk(tree):
+        if isinstance(n, ast.AugAssign) and isinstance(n.target, ast.Name):
+            reads.add(n.target.id)
+        elif isinstance(n, ast.Name) and isinstance(n.ctx, ast.Del):
+            reads.add(n.id)
+        elif isinstance(n, ast.ImportFrom) and any(a.name == "*" for a in n.names):
+            star = True
+    return reads, star
+
+
+def _bound_names(stmt: ast.stmt) -> set[str]:
+    # names a top-level statement binds whenever it runs; compound
+    # statements may skip their body and bind nothing for sure
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+        if isinstance(stmt, ast.AnnAssign) and stmt.value is None:
+            return set()
+        targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+        return {n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name)}
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return {(a.asname or a.name).split(".")[0] for a in stmt.names if a.name != "*"}
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {stmt.name}
+    return set()
+
+
+def _read_early(tree: ast.Module) -> set[str]:
+    # names used in a top-level statement before an earlier one bound them,
+    # including uses inside functions and classes defined there
+    bound: set[str] = set()
+    early: set[str] = set()
+    for stmt in tree.body:
+        for n in ast.walk(stmt):
+            if isinstance(n, ast.Name) and not isinstance(n.ctx, ast.Store) and n.id not in bound:
+                early.add(n.id)
+            elif isinstance(n, ast.AugAssign) and isinstance(n.target, ast.Name) and n.target.id not in bound:
+                early.add(n.target.id)
+        bound |= _bound_names(stmt)
+    return early
+
+
+def symbols_of(code: str) -> NodeSymbols:
+    """Analyze `code` without the cache."""
+    try:
+        table = symtable.symtable(code, "<node>", "exec")
+    except SyntaxError:
+        # the node fails when it runs anyway
+        return NodeSymbols(frozenset(), frozenset(), dynamic=True)
+
+    reads: set[str] = set()
+    writes: set[str] = set()
+    for symbol in table.get_symbols():
+        name = symbol.get_name()
+        if symbol.is_referenced():
+            reads.add(name)
+        if symbol.is_assigned() or symbol.is_imported() or symbol.is_namespace():
+            writes.add(name)
+
+    # Funktionen und Klassen: nur Namen, die global aufgelöst werden
+    pending = list(table.get_children())
+    while pending:
+        child = pending.pop()
+        pending.extend(child.get_children())
+        for symbol in child.get_symbols():
+            if not symbol.is_global():
+                continue
+            if symbol.is_referenced():
+                reads.add(symbol.get_name())
+            if symbol.is_declared_global() and symbol.is_assigned():
+                writes.add(symbol.get_name())
+
+    tree = ast.parse(code)
+    scanned, star = _scan(tree)
+    reads |= scanned
+    dynamic = bool(reads & _DYNAMIC) or star
+    return NodeSymbols(frozenset(reads), frozenset(writes), dynamic, frozenset(reads & _read_early(tree)))
+
+
+_cache: OrderedDict[str, NodeSymbols] = OrderedDict()
+_lock = threading.Lock()
+
+
+def analyze(node: "NodeData") -> NodeSymbols:
+    """Symbols of the node's code, cached per code hash."""
+    key = node.code_hash
+    with _lock:
+        symbols = _cache.get(key)
+        if symbols is not None:
+            _cache.move_to_end(key)
+            return symbols
+
+    symbols = symbols_of(node.code)
+    with _lock:
+        _cache[key] = symbols
+        if len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return symbols
@@ -0,0 +1,117 @@
+from typing import TYPE_CHECKING, Any
+
+from nython.core.runtime.profiling import RunHook
+
+import queue
+import threading
+
+if TYPE_CHECKING:
+    from nython.core.runtime.flow import Flow
+    from nython.core.runtime.node import NodeData
+
+
+class RunCancelled(Exception):
+    """Raised before the next node once a background run was cancelled."""
+
+
+class RunEvent:
+    # node states
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CACHED = "cached"
+
+    # end of the run
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+    ERROR = "error"
+
+    def __init__(self, kind: str, node: "NodeData | None" = None, error: BaseException | None = None) -> None:
+        self.kind: str = kind
+        self.node: "NodeData | None" = node
+        self.error: BaseException | None = error
+
+    def __repr__(self) -> str:
+        node = None if self.node is None else self.node.uuid
+        return f"RunEvent({self.kind!r}, node={node!r})"
+
+
+class BackgroundRun(RunHook):
+    """
+    Runs `Flow.run` on a worker thread and reports progress as events.
+
+    The run installs itself as a hook, so every node produces a RUNNING event
+    followed by DONE or FAILED (or a single CACHED event), and the run ends
+    with FINISHED, CANCELLED or ERROR. Events are collected with `poll`,
+    which never blocks, so a UI can drain them once per frame. `cancel`
+    stops the run before the next node starts; nodes already executing run
+    to completion.
+
+    The flow must not be edited while `running` is true: the worker thread
+    reads its links and node code throughout the run.
+    """
+
+    def __init__(self, flow: "Flow", **run_kwargs: Any) -> None:
+        self.flow: "Flow" = flow
+        self.run_kwargs: dict = run_kwargs
+
+        self.result: dict | None = None
+        self.error: BaseException | None = None
+
+        self._events: queue.SimpleQueue[RunEvent] = queue.SimpleQueue()
+        self._cancel = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "BackgroundRun":
+        self._thread = threading.Thread(target=self._work, name="nython-run", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def poll(self, limit: int | None = None) -> list[RunEvent]:
+        events = []
+        while limit is None or len(events) < limit:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def _work(self):
+        # first, so a cancelled run stops before any other hook sees the node
+        self.flow.hooks.insert(0, self)
+        try:
+            self.result = self.flow.run(**self.run_kwargs)
+        except RunCancelled:
+            self._events.put(RunEvent(RunEvent.CANCELLED))
+        except BaseException as err:
+            self.error = err
+            self._events.put(RunEvent(RunEvent.ERROR, error=err))
+        else:
+            self._events.put(RunEvent(RunEvent.FINISHED))
+        finally:
+            self.flow.hooks.remove(self)
+
+    def before(self, node: "NodeData"):
+        if self._cancel.is_set():
+            raise RunCancelled()
+        self._events.put(RunEvent(RunEvent.RUNNING, node))
+
+    def after(self, node: "NodeData", result: tuple[dict, dict] | None, error: BaseException | None):
+        if error is None:
+            self._events.put(RunEvent(RunEvent.DONE, node))
+        else:
+            self._events.put(RunEvent(RunEvent.FAILED, node, error))
+
+    def cached(self, node: "NodeData"):
+        self._events.put(RunEvent(RunEvent.CACHED, node))
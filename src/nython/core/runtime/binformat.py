@@ -0,0 +1,219 @@
+"""
+Compact binary flow format.
+
+A file starts with `MAGIC` followed by one length-prefixed record per node:
+
+    u32 length | payload
+
+The payload holds the uuid, name and code of the node and its input and
+output connectors with their connections. Strings are stored as u32 length
+plus UTF-8 bytes, uuids carry a one byte tag for int or str. Optional
+fields follow as tagged trailers (the canvas position: `p` plus two f64),
+readers skip to the next record after the fields they know. Nodes are
+written and read one record at a time, so neither side needs the whole
+file in memory.
+"""
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+from nython.core.runtime.connector import Connector, ConnectorType
+from nython.core.runtime.node import NodeData
+
+import json
+import struct
+import textwrap
+
+MAGIC = b"NYFL\x01"
+SUFFIX = ".nyb"
+
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_POS = struct.Struct("<dd")
+
+_TAG_INT = b"i"
+_TAG_BIGINT = b"I"
+_TAG_STR = b"s"
+_TAG_POS = b"p"
+
+
+class FormatError(ValueError):
+    pass
+
+
+def is_binary(filename: str) -> bool:
+    """Check the magic bytes of a flow file."""
+    with open(filename, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _put_str(out: bytearray, value: str):
+    data = value.encode("utf-8")
+    out += _U32.pack(len(data))
+    out += data
+
+
+def _put_id(out: bytearray, value: str | int):
+    if isinstance(value, int):
+        if -2**63 <= value < 2**63:
+            out += _TAG_INT
+            out += _I64.pack(value)
+        else:
+            out += _TAG_BIGINT
+            _put_str(out, str(value))
+    else:
+        out += _TAG_STR
+        _put_str(out, str(value))
+
+
+def _put_connectors(out: bytearray, connectors: list[Connector]):
+    out += _U32.pack(len(connectors))
+    for conn in connectors:
+        _put_id(out, conn.uuid)
+        out += _U32.pack(len(conn.connections))
+        for target in conn.connections:
+            _put_id(out, target)
+
+
+def encode_node(node: NodeData) -> bytes:
+    out = bytearray()
+    _put_id(out, node.uuid)
+    _put_str(out, node.title)
+    _put_str(out, node.code)
+    _put_connectors(out, node.inputs)
+    _put_connectors(out, node.outputs)
+    if node.pos is not None:
+        out += _TAG_POS
+        out += _POS.pack(*node.pos)
+    return bytes(out)
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def read_u32(self) -> int:
+        value = _U32.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def read_str(self) -> str:
+        size = self.read_u32()
+        value = str(self.data[self.pos:self.pos + size], "utf-8")
+        self.pos += size
+        return value
+
+    def read_id(self) -> str | int:
+        tag = self.read_tag()
+        if tag == _TAG_INT:
+            value = _I64.unpack_from(self.data, self.pos)[0]
+            self.pos += 8
+            return value
+        if tag == _TAG_BIGINT:
+            return int(self.read_str())
+        if tag == _TAG_STR:
+            return self.read_str()
+        raise FormatError(f"Unknown uuid tag {tag!r}")
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.data)
+
+    def read_tag(self) -> bytes:
+        tag = bytes(self.data[self.pos:self.pos + 1])
+        self.pos += 1
+        return tag
+
+    def read_pos(self) -> list[float]:
+        x, y = _POS.unpack_from(self.data, self.pos)
+        self.pos += _POS.size
+        return [x, y]
+
+    def read_connectors(self, type: ConnectorType) -> list[Connector]:
+        result = []
+        for _ in range(self.read_u32()):
+            conn = Connector(self.read_id())
+            conn.type = type
+            conn.connections = {self.read_id() for _ in range(self.read_u32())}
+            result.append(conn)
+        return result
+
+
+def decode_node(data: bytes) -> NodeData:
+    reader = _Reader(data)
+    try:
+        uuid = reader.read_id()
+        title = reader.read_str()
+        node = NodeData(uuid, reader.read_str())
+        node.title = title
+        node.inputs = reader.read_connectors(ConnectorType.INPUT)
+        node.outputs = reader.read_connectors(ConnectorType.OUTPUT)
+
+        # optional trailers, unknown ones end the record
+        while not reader.at_end():
+            if reader.read_tag() != _TAG_POS:
+                break
+            node.pos = reader.read_pos()
+    except struct.error as err:
+        raise FormatError(f"Truncated node record: {err}") from err
+
+    return node
+
+
+def write_nodes(file: BinaryIO, nodes: Iterable[NodeData]):
+    """Write the header and one record per node to a binary file object."""
+    file.write(MAGIC)
+    for node in nodes:
+        payload = encode_node(node)
+        file.write(_U32.pack(len(payload)))
+        file.write(payload)
+
+
+def iter_nodes(file: BinaryIO) -> Iterator[NodeData]:
+    """Yield the nodes of a binary file object one record at a time."""
+    if file.read(len(MAGIC)) != MAGIC:
+        raise FormatError("Not a binary nython flow")
+
+    while True:
+        header = file.read(4)
+        if not header:
+            return
+        if len(header) < 4:
+            raise FormatError("Truncated record header")
+
+        size = _U32.unpack(header)[0]
+        payload = file.read(size)
+        if len(payload) < size:
+            raise FormatError("Truncated node record")
+
+        yield decode_node(payload)
+
+
+def write_json_nodes(out: TextIO, nodes: Iterable[NodeData]):
+    """
+    Write nodes as the JSON array used by `Flow.save`, one node at a time.
+
+    The output matches `json.dumps(nodes, indent=4)` without ever holding the
+    text of the whole flow in memory.
+    """
+    first = True
+    for node in nodes:
+        out.write("[\n" if first else ",\n")
+        out.write(textwrap.indent(json.dumps(node.to_dict(), indent=4), "    "))
+        first = False
+    out.write("[]" if first else "\n]")
+
+
+def convert(source: str, target: str):
+    """
+    Convert a flow file between the JSON and the binary format.
+
+    The direction follows the source: a binary source is written as JSON, a
+    JSON source as binary.
+    """
+    if is_binary(source):
+        with open(source, "rb") as file, open(target, "w") as out:
+            write_json_nodes(out, iter_nodes(file))
+    else:
+        with open(source, "r") as file:
+            nodes = json.load(file)
+        with open(target, "wb") as out:
+            write_nodes(out, (NodeData.from_dict(node) for node in nodes))
@@ -0,0 +1,167 @@
+from collections import OrderedDict, deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Mapping
+
+from nython.core.runtime.namespace import Scope, layer
+
+import builtins
+import copy
+import sys
+
+
+def namespace_size(namespace: dict) -> int:
+    """Shallow size estimate of a namespace in bytes (builtins excluded)."""
+    size = sys.getsizeof(namespace)
+    for key, value in namespace.items():
+        if value is builtins.__dict__:
+            continue
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+# shared between namespaces and never copied, not counted by deep_size
+_SHARED = (ModuleType, FunctionType, BuiltinFunctionType, MethodType, type)
+
+
+def deep_size(namespace: Mapping, limit: int | None = None) -> int:
+    """
+    Size estimate of a namespace and of everything its values reach through
+    containers and instance dicts, in bytes. Modules, functions, classes and
+    the builtins are not counted. Counting stops once `limit` is exceeded.
+    """
+    size = sys.getsizeof(namespace)
+    seen = {id(builtins.__dict__)}
+    pending = [*namespace.keys(), *namespace.values()]
+    while pending:
+        value = pending.pop()
+        if id(value) in seen or isinstance(value, _SHARED):
+            continue
+        seen.add(id(value))
+
+        size += sys.getsizeof(value)
+        if limit is not None and size > limit:
+            break
+
+        if isinstance(value, dict):
+            pending.extend(value.keys())
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset, deque)):
+            pending.extend(value)
+        else:
+            attrs = getattr(value, "__dict__", None)
+            if isinstance(attrs, dict):
+                pending.append(attrs)
+    return size
+
+
+def _copy(namespace: Mapping) -> dict:
+    # modules and the builtins are shared, every other value is copied
+    memo = {id(value): value for value in namespace.values()
+            if isinstance(value, ModuleType) or value is builtins.__dict__}
+    return copy.deepcopy(dict(namespace), memo)
+
+
+class CachedResult:
+    """
+    Deep copy of the names a node wrote, taken when its result is cached.
+
+    `thaw` layers a fresh copy over the inputs of the current run, so nodes
+    mutating values they inherited from a cache hit, e.g. appending to an
+    upstream list, change neither the cache nor later runs.
+    """
+
+    def __init__(self, g: dict, own: dict, hidden: set, size: int) -> None:
+        self.g: dict = g
+        self.own: dict = own
+        self.hidden: set = hidden
+
+        # estimated with deep_size before copying
+        self.size: int = size
+
+    @classmethod
+    def freeze(cls, result: tuple[Mapping, Mapping], limit: int | None = None) -> "CachedResult | None":
+        """
+        Copy a node result, None if one of its values cannot be copied or
+        if its estimated size exceeds `limit` bytes; the size is estimated
+        first, so oversized results are never copied.
+        """
+        g, l = result
+        own, hidden = l.writes() if isinstance(l, Scope) else (dict(l), set())
+
+        size = deep_size(g, limit)
+        size += deep_size(own, None if limit is None else limit - size)
+        if limit is not None and size > limit:
+            return None
+
+        try:
+            return cls(_copy(g), _copy(own), hidden, size)
+        except Exception:
+            # locks, open files, generators, ...
+            return None
+
+    def thaw(self, g: Mapping, l: Mapping) -> tuple[dict, Scope]:
+        """The cached result on top of the inputs `g` and `l` of this run."""
+        scope = layer(g, l)
+        scope.apply(_copy(self.own), self.hidden)
+        return _copy(self.g), scope
+
+
+class ResultCache:
+    """
+    LRU cache of node results keyed by fingerprint.
+
+    A fingerprint covers the code of a node and the fingerprints of its
+    predecessors, so an entry stays valid as long as nothing upstream changed.
+    Entries are evicted least recently used first once the estimated size of
+    all cached namespaces exceeds `budget` bytes. Sizes come from
+    `deep_size`, so the budget is approximate: memory held by objects it
+    cannot look into, e.g. C extension types, is not counted.
+
+    Only copies of the names a node wrote are cached (see `CachedResult`),
+    so a hit hands out values equal to, but not identical with, the ones of
+    the run that stored them. Results holding values that cannot be deep
+    copied or that alone exceed the budget are not cached, such nodes run
+    every time.
+    """
+
+    def __init__(self, budget: int = 256 * 1024 * 1024) -> None:
+        self.budget: int = budget
+        self.size: int = 0
+
+        self._entries: OrderedDict[str, tuple[CachedResult, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._entries
+
+    def get(self, fingerprint: str) -> CachedResult | None:
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(fingerprint)
+        return entry[0]
+
+    def put(self, fingerprint: str, result: tuple[dict, dict]):
+        old = self._entries.pop(fingerprint, None)
+        if old is not None:
+            self.size -= old[1]
+
+        # a single result above the budget would evict everything else
+        entry = CachedResult.freeze(result, self.budget)
+        if entry is None:
+            return
+        size = entry.size
+
+        self._entries[fingerprint] = (entry, size)
+        self.size += size
+
+        while self.size > self.budget:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
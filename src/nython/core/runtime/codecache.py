@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+from types import CodeType
+
+import hashlib
+import marshal
+import os
+import threading
+
+
+def source_hash(code: str) -> str:
+    """Stable SHA-256 hex digest of node source code."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("NYTHON_CACHE_DIR")
+    if base:
+        return Path(base)
+
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    return Path(xdg if xdg else Path.home() / ".cache") / "nython" / "bytecode"
+
+
+# files written between two scans of the disk tier for its size bound
+PRUNE_EVERY = 64
+
+
+class CodeCache:
+    """
+    Content addressed cache of compiled node code.
+
+    Code objects are kept in memory and, if `directory` is given, written as
+    marshal files similar to `__pycache__`. Files carry the interpreter's
+    magic number so a different Python version never loads them. Disk errors
+    are ignored and only cost a recompile. The memory tier holds at most
+    `max_entries` code objects and drops the least recently used first.
+
+    The disk tier is kept below `max_disk_bytes`: the first write of a
+    process and every `PRUNE_EVERY` writes after it delete the files read or
+    written least recently (by mtime, which a hit refreshes) until the
+    directory is down to three quarters of the bound.
+    """
+
+    def __init__(self, directory: str | Path | None = None, max_entries: int = 4096,
+                 max_disk_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory: Path | None = Path(directory) if directory is not None else None
+        self.max_entries: int = max_entries
+        self.max_disk_bytes: int = max_disk_bytes
+        self._memory: OrderedDict[str, CodeType] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes: int = 0
+
+    def _key(self, digest: str, filename: str, flags: int) -> str:
+        if filename == "<string>" and not flags:
+            return digest
+        return hashlib.sha256(f"{digest}:{filename}:{flags}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / key[:2] / f"{key}.bin"
+
+    def _read(self, key: str) -> CodeType | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            # recently used files survive pruning
+            os.utime(path)
+        except OSError:
+            return None
+
+        if data[:len(MAGIC_NUMBER)] != MAGIC_NUMBER:
+            return None
+
+        try:
+            code = marshal.loads(data[len(MAGIC_NUMBER):])
+        except (EOFError, ValueError, TypeError):
+            return None
+        return code if isinstance(code, CodeType) else None
+
+    def _write(self, key: str, code: CodeType):
+        import tempfile
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(MAGIC_NUMBER + marshal.dumps(code))
+            os.replace(tmp, path)
+        except OSError:
+            return
+
+        with self._lock:
+            due = self._writes % PRUNE_EVERY == 0
+            self._writes += 1
+        if due:
+            self.prune()
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """Delete the least recently used files while the disk tier exceeds `max_bytes`, return how many."""
+        if self.directory is None:
+            return 0
+        limit = self.max_disk_bytes if max_bytes is None else max_bytes
+
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= limit:
+            return 0
+
+        # etwas Luft lassen, damit nicht bei jedem Schreiben aufgeräumt wird
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= limit * 3 // 4:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def get(self, digest: str, filename: str = "<string>", flags: int = 0) -> CodeType | None:
+        """Cached code object for the source with `digest`, None on a miss."""
+        key = self._key(digest, filename, flags)
+
+        with self._lock:
+            code = self._memory.get(key)
+            if code is not None:
+                self._memory.move_to_end(key)
+                return code
+
+        if self.directory is not None:
+            code = self._read(key)
+            if code is not None:
+                self._remember(key, code)
+        return code
+
+    def put(self, digest: str, code: CodeType, filename: str = "<string>", flags: int = 0):
+        """Store a code object compiled elsewhere, e.g. in another process."""
+        key = self._key(digest, filename, flags)
+        if self.directory is not None:
+            self._write(key, code)
+        self._remember(key, code)
+
+    def _remember(self, key: str, code: CodeType):
+        with self._lock:
+            self._memory[key] = code
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def compile(self, source: str, filename: str = "<string>", flags: int = 0,
+                digest: str | None = None) -> CodeType:
+        """Return the code object for `source`, compiling it only on a miss."""
+        digest = digest or source_hash(source)
+
+        code = self.get(digest, filename, flags)
+        if code is None:
+            code = compile(source, filename, "exec", flags)
+            self.put(digest, code, filename, flags)
+        return code
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+
+code_cache = CodeCache(None if os.environ.get("NYTHON_NO_BYTECODE_CACHE") else default_cache_dir())
@@ -0,0 +1,210 @@
+"""
+Background compilation of node code while it is being edited.
+
+Edits are submitted on every keystroke, but a node is only compiled once
+its text stayed unchanged for `delay` seconds. Compilation runs in a helper
+process, because `compile()` holds the GIL for its whole duration and would
+stall the render loop for long scripts. Results are picked up with `poll`:
+the code object of a successful compile goes into the shared code cache, so
+the node finds it there when it runs, failed compiles come back as a
+`Diagnostic` with the position of the syntax error.
+"""
+from typing import TYPE_CHECKING
+
+from nython.core.runtime.codecache import code_cache, source_hash
+
+from types import CodeType
+
+import marshal
+import threading
+import time
+
+if TYPE_CHECKING:
+    from nython.core.runtime.node import NodeData
+
+# Wartezeit nach dem letzten Tastendruck, bevor kompiliert wird
+DEFAULT_DELAY = 0.3
+
+
+class Diagnostic:
+    """Why a node's code does not compile; `line` and `column` are 1-based and may be None."""
+
+    def __init__(self, message: str, line: int | None = None, column: int | None = None) -> None:
+        self.message: str = message
+        self.line: int | None = line
+        self.column: int | None = column
+
+    @classmethod
+    def from_error(cls, err: SyntaxError) -> "Diagnostic":
+        return cls(err.msg, err.lineno, err.offset)
+
+    def __str__(self) -> str:
+        if self.line is None:
+            return self.message
+        if self.column is None:
+            return f"line {self.line}: {self.message}"
+        return f"line {self.line}, column {self.column}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"Diagnostic({self.message!r}, {self.line}, {self.column})"
+
+
+class CompileResult:
+    """Outcome of compiling one submitted text of a node."""
+
+    def __init__(self, node: "NodeData", code: str, compiled: CodeType | None,
+                 diagnostic: Diagnostic | None) -> None:
+        self.node: "NodeData" = node
+        self.code: str = code
+        self.compiled: CodeType | None = compiled
+        self.diagnostic: Diagnostic | None = diagnostic
+
+    @property
+    def ok(self) -> bool:
+        return self.diagnostic is None
+
+
+def _compile_source(source: str) -> tuple[bytes | None, Diagnostic | None]:
+    # runs in the helper process, code objects travel as marshal data
+    try:
+        code = compile(source, "<string>", "exec")
+    except SyntaxError as err:
+        return None, Diagnostic.from_error(err)
+    except ValueError as err:
+        # e.g. null bytes in the source
+        return None, Diagnostic(str(err))
+    return marshal.dumps(code), None
+
+
+class CompileService:
+    """
+    Debounced compilation of edited node code off the UI thread.
+
+        service.submit(node, text)      # on every edit
+        for result in service.poll():   # once per frame
+            ...
+
+    `poll` only returns results for the latest text submitted per node,
+    outdated ones are dropped. The latest successful code object per node
+    is kept in `compiled`. With `processes=False` code is compiled on the
+    service thread instead of a helper process.
+    """
+
+    def __init__(self, delay: float = DEFAULT_DELAY, processes: bool = True) -> None:
+        self.delay: float = delay
+        self.compiled: dict[str | int, CodeType] = {}
+
+        # node uuid -> (node, text, due time), latest submitted text per node
+        self._pending: dict[str | int, tuple["NodeData", str, float]] = {}
+        self._latest: dict[str | int, str] = {}
+        self._results: list[CompileResult] = []
+        self._wakeup = threading.Condition()
+        self._closed = False
+
+        self._executor = None
+        if processes:
+            # spawned, forking the editor process with its render thread is not safe
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+
+        self._thread = threading.Thread(target=self._loop, name="nython-compile", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "CompileService":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def submit(self, node: "NodeData", code: str):
+        """Compile `code` for `node` once it was not changed for `delay` seconds."""
+        with self._wakeup:
+            self._latest[node.uuid] = code
+            self._pending[node.uuid] = (node, code, time.monotonic() + self.delay)
+            self._wakeup.notify()
+
+    def poll(self) -> list[CompileResult]:
+        """Results finished since the last call, never blocks."""
+        with self._wakeup:
+            results, self._results = self._results, []
+
+            current = []
+            for result in results:
+                if self._latest.get(result.node.uuid) != result.code:
+                    # edited again while it was compiled
+                    continue
+                if result.compiled is not None:
+                    self.compiled[result.node.uuid] = result.compiled
+                current.append(result)
+        return current
+
+    def flush(self) -> list[CompileResult]:
+        """Compile every pending edit right away in this thread, e.g. before a run."""
+        with self._wakeup:
+            batch = list(self._pending.values())
+            self._pending.clear()
+
+        for node, code, _ in batch:
+            result = self._compile(node, code)
+            with self._wakeup:
+                self._results.append(result)
+        return self.poll()
+
+    def discard(self, node: "NodeData"):
+        """Forget pending edits and results of a removed node."""
+        with self._wakeup:
+            self._pending.pop(node.uuid, None)
+            self._latest.pop(node.uuid, None)
+            self.compiled.pop(node.uuid, None)
+
+    def close(self):
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _loop(self):
+        while True:
+            with self._wakeup:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    due = [uuid for uuid, (_, _, at) in self._pending.items() if at <= now]
+                    if due:
+                        break
+                    wait = min((at for _, _, at in self._pending.values()), default=None)
+                    self._wakeup.wait(None if wait is None else wait - now)
+                batch = [self._pending.pop(uuid) for uuid in due]
+
+            for node, code, _ in batch:
+                result = self._compile(node, code)
+                with self._wakeup:
+                    self._results.append(result)
+
+    def _compile(self, node: "NodeData", code: str) -> CompileResult:
+        digest = source_hash(code)
+        compiled = code_cache.get(digest)
+        if compiled is not None:
+            return CompileResult(node, code, compiled, None)
+
+        data, diagnostic = self._run(code)
+        if data is None:
+            return CompileResult(node, code, None, diagnostic)
+
+        compiled = marshal.loads(data)
+        code_cache.put(digest, compiled)
+        return CompileResult(node, code, compiled, None)
+
+    def _run(self, code: str) -> tuple[bytes | None, Diagnostic | None]:
+        if self._executor is not None:
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                return self._executor.submit(_compile_source, code).result()
+            except (BrokenProcessPool, RuntimeError):
+                # helper process gone or shut down, compile here from now on
+                self._executor = None
+        return _compile_source(code)
@@ -0,0 +1,306 @@
+"""
+Shared memory data plane for large values passed between processes.
+
+Without it, every namespace sent to a worker process is pickled, so large
+buffers are copied for each node. With a `DataPlane` passed to `Flow.run`,
+bytes, bytearray, array.array and NumPy arrays above a size threshold are
+stored once in a `multiprocessing.shared_memory` segment and only a small
+`SharedValue` handle is pickled. The receiving side maps the segment and
+gets a zero-copy view: a read-only memoryview for bytes, a writable one for
+bytearray, a memoryview cast to the item type for array.array and an
+ndarray for NumPy arrays.
+
+The plane counts the node results holding each segment and unlinks a
+segment once no result references it any more; `close` unlinks the rest.
+Views stay valid after unlinking until they are garbage collected. Segments
+stay registered with the resource tracker of `multiprocessing`, which all
+processes of a run share, so it removes what a crashed run left behind.
+"""
+from typing import Any, Mapping
+
+import array
+import importlib
+import os
+import sys
+import threading
+
+DEFAULT_THRESHOLD = 1 << 20
+
+
+class SharedValue:
+    """Picklable reference to a buffer stored in a shared memory segment."""
+
+    def __init__(self, name: str, kind: str, nbytes: int, meta: Any = None) -> None:
+        self.name: str = name
+        self.kind: str = kind
+        self.nbytes: int = nbytes
+        self.meta: Any = meta
+
+    def __repr__(self) -> str:
+        return f"SharedValue({self.name!r}, {self.kind!r}, {self.nbytes})"
+
+
+def _buffer_info(value: Any) -> tuple[str, int, Any] | None:
+    # (kind, nbytes, meta) of supported buffer values, None for everything else
+    if isinstance(value, bytes):
+        return "bytes", len(value), None
+    if isinstance(value, bytearray):
+        return "bytearray", len(value), None
+    if isinstance(value, array.array):
+        return "array", len(value) * value.itemsize, value.typecode
+
+    # NumPy is only considered if a node already imported it
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        return "ndarray", value.nbytes, (value.dtype.str, value.shape)
+    return None
+
+
+def share_tracker():
+    """
+    Start the resource tracker of this process, so worker processes forked
+    afterwards share it instead of starting their own, which would unlink
+    the segments they registered as soon as they exit.
+    """
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+
+
+def _open(name: str | None = None, size: int = 0):
+    from multiprocessing import shared_memory
+    return shared_memory.SharedMemory(name, create=name is None, size=size)
+
+
+def _copy_in(value: Any, kind: str, nbytes: int):
+    shm = _open(size=nbytes)
+    if kind == "ndarray":
+        np = sys.modules["numpy"]
+        target = np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)
+        target[...] = value
+        del target
+    else:
+        shm.buf[:nbytes] = memoryview(value).cast("B")
+    return shm
+
+
+class _Attachments:
+    # segments mapped by this process and the views handed out for them
+
+    def __init__(self) -> None:
+        self.segments: dict[str, Any] = {}
+        self.views: dict[int, tuple[Any, SharedValue]] = {}
+        self.lock = threading.Lock()
+
+        # dropped segments whose views are still alive; they cannot be
+        # closed before the views are gone and are retried on the next drop
+        self.lingering: list[Any] = []
+
+    def add(self, shm, handle: SharedValue):
+        with self.lock:
+            self.segments.setdefault(handle.name, shm)
+
+    def view(self, handle: SharedValue) -> Any:
+        with self.lock:
+            shm = self.segments.get(handle.name)
+            if shm is None:
+                shm = self.segments[handle.name] = _open(handle.name)
+
+            buf = shm.buf[:handle.nbytes]
+            if handle.kind == "bytes":
+                value = buf.toreadonly()
+            elif handle.kind == "bytearray":
+                value = buf
+            elif handle.kind == "array":
+                value = buf.cast(handle.meta)
+            else:
+                dtype, shape = handle.meta
+                value = importlib.import_module("numpy").ndarray(shape, dtype=dtype, buffer=buf)
+
+            self.views[id(value)] = (value, handle)
+            return value
+
+    def handle_of(self, value: Any) -> SharedValue | None:
+        entry = self.views.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+        return None
+
+    def unlink(self, name: str):
+        """Remove the segment `name`, mappings stay valid until closed."""
+        with self.lock:
+            shm = self.segments.get(name)
+            if shm is None:
+                try:
+                    shm = self.segments[name] = _open(name)
+                except FileNotFoundError:
+                    return
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def drop(self, names: set[str] | None = None):
+        """Forget views and close the segments, or all of them without `names`."""
+        with self.lock:
+            for key, (_, handle) in list(self.views.items()):
+                if names is None or handle.name in names:
+                    del self.views[key]
+
+            closing = self.lingering
+            self.lingering = []
+            for name in list(self.segments):
+                if names is None or name in names:
+                    closing.append(self.segments.pop(name))
+
+            for shm in closing:
+                try:
+                    shm.close()
+                except BufferError:
+                    # a view handed out earlier is still referenced
+                    self.lingering.append(shm)
+
+
+# process wide, shared by the DataPlane of the parent and the worker side
+_local = _Attachments()
+
+
+def view(handle: SharedValue) -> Any:
+    """Zero-copy view of a shared value in this process."""
+    return _local.view(handle)
+
+
+def release_local():
+    """Close segments mapped by earlier tasks of a worker process whose views are gone."""
+    _local.drop()
+
+
+class Exporter:
+    """Moves large buffers of a namespace into shared memory, used on the worker side."""
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        self.threshold: int = threshold
+
+    def export(self, value: Any) -> Any:
+        handle = _local.handle_of(value)
+        if handle is not None:
+            return handle
+
+        info = _buffer_info(value)
+        if info is None or info[1] < self.threshold:
+            return value
+
+        kind, nbytes, meta = info
+        shm = _copy_in(value, kind, nbytes)
+        handle = SharedValue(shm.name, kind, nbytes, meta)
+        self._created(shm, handle, value)
+        return handle
+
+    def _created(self, shm, handle: SharedValue, value: Any):
+        # the receiving side owns the segment, this process only closes it
+        shm.close()
+
+    def export_namespace(self, namespace: Mapping) -> Mapping:
+        exported = None
+        for name, value in namespace.items():
+            new = self.export(value)
+            if new is not value:
+                if exported is None:
+                    exported = dict(namespace)
+                exported[name] = new
+        return namespace if exported is None else exported
+
+
+class DataPlane(Exporter):
+    """
+    Owner of the shared memory segments of the runs it is passed to.
+
+        with DataPlane() as plane:
+            flow.run(parallel=True, processes=True, plane=plane)
+
+    Only process based runs (`processes=True` or a `WorkerPool`) use it;
+    threads share their namespaces anyway.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        super().__init__(threshold)
+        share_tracker()
+        self._refs: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # values copied into segments by this process, kept alive so their ids stay unique
+        self._sources: dict[int, tuple[Any, SharedValue]] = {}
+
+    @property
+    def segments(self) -> int:
+        return len(self._refs)
+
+    def __enter__(self) -> "DataPlane":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def export(self, value: Any) -> Any:
+        entry = self._sources.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+        return super().export(value)
+
+    def _created(self, shm, handle: SharedValue, value: Any):
+        _local.add(shm, handle)
+        with self._lock:
+            self._refs.setdefault(handle.name, 0)
+            self._sources[id(value)] = (value, handle)
+
+    def adopt(self, handle: SharedValue):
+        """Take ownership of a segment created by a worker process."""
+        with self._lock:
+            self._refs.setdefault(handle.name, 0)
+
+    def _handles(self, namespace: Mapping) -> set[str]:
+        if hasattr(namespace, "flatten"):
+            namespace = namespace.flatten()
+        names = set()
+        for value in namespace.values():
+            handle = _local.handle_of(value)
+            if handle is not None:
+                names.add(handle.name)
+        return names
+
+    def retain(self, namespace: Mapping):
+        """Count a node result as holder of the segments it references."""
+        with self._lock:
+            for name in self._handles(namespace):
+                if name in self._refs:
+                    self._refs[name] += 1
+
+    def release(self, namespace: Mapping):
+        """Drop a holder, segments without holders are freed."""
+        free = set()
+        with self._lock:
+            for name in self._handles(namespace):
+                if name in self._refs:
+                    self._refs[name] -= 1
+                    if self._refs[name] <= 0:
+                        free.add(name)
+        self._free(free)
+
+    def _free(self, names: set[str]):
+        if not names:
+            return
+
+        with self._lock:
+            for name in names:
+                self._refs.pop(name, None)
+            for key, (_, handle) in list(self._sources.items()):
+                if handle.name in names:
+                    del self._sources[key]
+
+        for name in names:
+            _local.unlink(name)
+        _local.drop(names)
+
+    def close(self):
+        """Free every segment of this plane."""
+        self._free(set(self._refs))
@@ -1,10 +1,111 @@
 from nython.core.runtime.node import NodeData
 from nython.core.runtime.connector import Connector
 from nython.core.runtime.connector import ConnectorType
+from nython.core.runtime.cache import ResultCache
+from nython.core.runtime import binformat
+from nython.core.runtime.journal import Journal
+from nython.core.runtime.profiling import RunHook
+from nython.core.runtime.ids import IdAllocator
+from nython.util.diff import diff_dict
+from nython.core.runtime.namespace import Scope, layer
+from nython.core.runtime import dataplane
+from nython.core.runtime.fusion import FusedChain, find_chains
+from nython.core.runtime.analysis import Conflict, analyze
 
-from typing import Union
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Mapping, Union
 
+import builtins
+import contextlib
+import hashlib
+import heapq
+import importlib
 import json
+import os
+
+if TYPE_CHECKING:
+    from nython.core.runtime.workers import WorkerPool
+    from nython.core.runtime.dataplane import DataPlane, Exporter
+
+
+_MISSING = object()
+
+
+class FlowCycleError(ValueError):
+    """Raised when the links of a flow form a cycle and no execution order exists."""
+
+    def __init__(self, nodes: list[NodeData]) -> None:
+        self.nodes: list[NodeData] = nodes
+        names = " -> ".join(f"{n.title} ({n.uuid})" for n in nodes + nodes[:1])
+        super().__init__(f"Flow contains a cycle: {names}")
+
+
+class _ModuleRef:
+    # stands in for an imported module, which cannot be pickled
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+
+
+def _detach(namespace: Mapping, plane: "Exporter | None" = None) -> dict:
+    # scopes are sent as flat dicts and the builtins module dict is replaced
+    # by a marker, so a worker process does not receive a copy of it;
+    # modules are sent by name and imported again on the other side, large
+    # buffers as shared memory handles if a data plane is used
+    if isinstance(namespace, Scope):
+        namespace = namespace.flatten()
+    if plane is not None:
+        namespace = plane.export_namespace(namespace)
+
+    modules = [name for name, value in namespace.items() if isinstance(value, ModuleType)]
+    has_builtins = namespace.get("__builtins__") is builtins.__dict__
+    if modules or has_builtins:
+        namespace = dict(namespace)
+        for name in modules:
+            namespace[name] = _ModuleRef(namespace[name].__name__)
+        if has_builtins:
+            namespace["__builtins__"] = None
+    return namespace
+
+
+def _attach(namespace: dict) -> dict:
+    if "__builtins__" in namespace and namespace["__builtins__"] is None:
+        namespace["__builtins__"] = builtins.__dict__
+    for name, value in namespace.items():
+        if isinstance(value, _ModuleRef):
+            namespace[name] = importlib.import_module(value.name)
+        elif isinstance(value, dataplane.SharedValue):
+            namespace[name] = dataplane.view(value)
+    return namespace
+
+
+def _execute_detached(uuid: str | int, code: str, g: dict, l: dict,
+                      threshold: int | None = None) -> tuple[dict, dict, set]:
+    # runs inside a worker process; compiled code objects cannot be pickled,
+    # so the node is rebuilt from its source. Only the node's own writes are
+    # sent back, the caller layers them over its original inputs again.
+    # With a threshold large written buffers go back through shared memory.
+    exporter = None
+    if threshold is not None:
+        dataplane.release_local()
+        exporter = dataplane.Exporter(threshold)
+
+    new_g, new_l = NodeData(uuid, code).execute(_attach(g), _attach(l))
+    own, hidden = new_l.writes()
+    return _detach(new_g, exporter), _detach(own, exporter), hidden
+
+
+def _reattach(g: Mapping, l: Mapping, result: tuple[dict, dict, set],
+              plane: "DataPlane | None" = None) -> tuple[dict, Scope]:
+    new_g, own, hidden = result
+    if plane is not None:
+        # segments written by the worker belong to the plane from now on
+        for value in (*new_g.values(), *own.values()):
+            if isinstance(value, dataplane.SharedValue):
+                plane.adopt(value)
+
+    scope = layer(g, l)
+    scope.apply(_attach(own), hidden)
+    return _attach(new_g), scope
 
 
 class Flow:
@@ -12,16 +113,112 @@ class Flow:
         self._nodes: list[NodeData] = list()
         self._connections: set[frozenset[Union[str, int]]] = set()
 
+        # Indexes, kept in sync by every mutation
+        self._connectors: dict[Union[str, int], Connector] = {}
+        self._owners: dict[Union[str, int], NodeData] = {}
+        self._node_index: dict[Union[str, int], NodeData] = {}
+
+        # connector uuid -> uuids it is paired with in _connections
+        self._peers: dict[Union[str, int], set[Union[str, int]]] = {}
+
+        # pairs that resolved to an output -> input edge between two nodes
+        self._edges: dict[frozenset[Union[str, int]], tuple[NodeData, NodeData]] = {}
+
+        # node adjacency as multisets, a node pair may be linked more than once
+        self._successors: dict[NodeData, dict[NodeData, int]] = {}
+        self._predecessors: dict[NodeData, dict[NodeData, int]] = {}
+
+        # insertion sequence, used as tie breaker for a deterministic order
+        self._order: dict[NodeData, int] = {}
+        self._sequence: int = 0
+
+        # cached execution order, None whenever the topology changed
+        self._plan: list[NodeData] | None = None
+
+        # fused linear chains by member, valid for the plan they were found in
+        self._chains: dict[NodeData, FusedChain] = {}
+        self._chains_plan: list[NodeData] | None = None
+
+        # uuids for new nodes and connectors, kept above every uuid added so far
+        self.ids: IdAllocator = IdAllocator()
+
+        # results of earlier runs, used by incremental runs
+        self.results: ResultCache = ResultCache()
+        self.cache_hits: list[NodeData] = []
+
+        # names read by a node that its predecessors provide with different values
+        self.conflicts: list[Conflict] = []
+
+        # namespace the root nodes of the current run start from
+        self._initial: Mapping = {}
+
+        # RunHook instances called around every node execution
+        self.hooks: list[RunHook] = []
+
+        # file the flow was loaded from and the optional mutation journal next to it
+        self.filename: str | None = None
+        self.journal: Journal | None = None
+        self.compact_after: int = 1000
+
+        # state of an open batch(): undo steps, journal records held back
+        # until the batch commits and nodes still to be dropped from _nodes
+        self._undo: list[Callable[[], None]] | None = None
+        self._batch_records: list[tuple[str, dict]] | None = None
+        self._doomed: set[NodeData] | None = None
+
     def add_node(self, node: NodeData):
-        """Add node to the flow. If emit is False, no events are emitted (useful during load)."""
-        self._nodes.append(node)
+        """Add node to the flow and index its connectors and their connections."""
+        if self._doomed is not None and node in self._doomed:
+            # removed earlier in the same batch, still in _nodes
+            self._doomed.discard(node)
+        else:
+            self._nodes.append(node)
+        self._node_index[node.uuid] = node
+        self._successors[node] = {}
+        self._predecessors[node] = {}
+        self._order[node] = self._sequence
+        self._sequence += 1
+        self._plan = None
+        self.ids.observe(node.uuid)
+
+        for conn in (node.inputs + node.outputs):
+            self._connectors[conn.uuid] = conn
+            self._owners[conn.uuid] = node
+            self.ids.observe(conn.uuid)
+
+        # pairs registered earlier by the other side are resolved here as well
+        for conn in (node.inputs + node.outputs):
+            for target in conn.connections | self._peers.get(conn.uuid, set()):
+                self._add_pair(conn.uuid, target)
+
+        if self._undo is not None:
+            self._undo.append(lambda: self.remove_node(node))
+        self._record("add_node", node=node.to_dict())
+
+    def create_node(self, title: str = "Name", code: str = "") -> NodeData:
+        """Create a node with one input and one output, using fresh uuids, and add it."""
+        node_id, input_id, output_id = self.ids.reserve(3)
+
+        node = NodeData(node_id, code)
+        node.title = title
+
+        in_conn = Connector(input_id)
+        in_conn.type = ConnectorType.INPUT
+        out_conn = Connector(output_id)
+        out_conn.type = ConnectorType.OUTPUT
+
+        node.inputs = [in_conn]
+        node.outputs = [out_conn]
+
+        self.add_node(node)
+        return node
+
+    def get_node(self, id: str|int) -> NodeData | None:
+        return self._node_index.get(id)
 
     def remove_node_by_id(self, id: str|int):
         # search node using uuid
-        node = next(
-            (n for n in self._nodes if getattr(n, "uuid", -1) == id),
-            None
-        )
+        node = self._node_index.get(id)
 
         if node is None:
             raise KeyError(f"No node with id {id}")
@@ -29,24 +226,77 @@ class Flow:
         self.remove_node(node)
 
     def remove_node(self, node: NodeData):
-        # entferne node aus der node-liste
-        self._nodes.remove(node)
+        if node not in self._order:
+            raise ValueError(f"Node {node.uuid} is not part of the flow")
+
+        if self._undo is not None:
+            self._undo.append(self._restorer(node))
+
+        # entferne node aus der node-liste, in einem batch erst beim Abschluss
+        if self._doomed is not None:
+            self._doomed.add(node)
+        else:
+            self._nodes.remove(node)
+
+        # entferne alle Verbindungen dieses nodes, auch in den Gegenstellen
+        for conn in (node.inputs + node.outputs):
+            for target in list(self._peers.get(conn.uuid, ())):
+                self._remove_pair(conn.uuid, target)
+
+                other = self._connectors.get(target)
+                if other is not None:
+                    other.connections.discard(conn.uuid)
 
-        # sammle alle connector-uuids dieses nodes
-        uuids = {c.uuid for c in (node.inputs + node.outputs)}
+            self._peers.pop(conn.uuid, None)
+            self._connectors.pop(conn.uuid, None)
+            self._owners.pop(conn.uuid, None)
 
-        # entferne alle Verbindungen, die eine dieser uuids enthalten
-        self._connections = {pair for pair in self._connections if not (pair & uuids)}
+        self._node_index.pop(node.uuid, None)
+        self._successors.pop(node, None)
+        self._predecessors.pop(node, None)
+        self._order.pop(node, None)
+        self._plan = None
 
-        # entferne referenzen in allen übrigen connector-objekten
-        for other in self._nodes:
-            for conn in (other.inputs + other.outputs):
-                conn.connections.difference_update(uuids)
+        self._record("remove_node", uuid=node.uuid)
+
+    def update_node(self, node: NodeData, code: str | None = None, title: str | None = None,
+                    pos: list[float] | None = None, compile: bool = True):
+        """
+        Change the code, title or canvas position of a node and record the
+        change in the journal. With `compile=False` the code is stored
+        without compiling it, see `NodeData.set_code`.
+        """
+        before = {"code": node.code, "name": node.title, "pos": node.pos}
+        after = {
+            "code": before["code"] if code is None else code,
+            "name": before["name"] if title is None else title,
+            "pos": before["pos"] if pos is None else [float(pos[0]), float(pos[1])],
+        }
+
+        changes = diff_dict(before, after)
+        if not changes:
+            return
+
+        # recorded first, set_code stores the code even if it does not compile
+        if self._undo is not None:
+            self._undo.append(lambda: self.update_node(node, code=before["code"], title=before["name"],
+                                                       pos=before["pos"], compile=False))
+        self._record("update", uuid=node.uuid, changes=changes)
+
+        node.title = after["name"]
+        node.pos = after["pos"]
+        if "code" in changes:
+            node.set_code(after["code"], compile)
+
+    def set_code(self, node: NodeData, code: str, compile: bool = True):
+        self.update_node(node, code=code, compile=compile)
 
     def disconnect(self, conn1: str | int, conn2: str | int):
-        pair = frozenset({conn1, conn2})
+        if self._undo is not None and frozenset({conn1, conn2}) in self._connections:
+            self._undo.append(lambda: self.connect(conn1, conn2))
+
         # sicher entfernen ohne KeyError
-        self._connections.discard(pair)
+        self._remove_pair(conn1, conn2)
 
         # aktualisiere Connector-Objekte falls vorhanden
         c1 = self._find_connector(conn1)
@@ -56,10 +306,13 @@ class Flow:
         if c2:
             c2.connections.discard(conn1)
 
+        self._record("disconnect", a=conn1, b=conn2)
+
     def connect(self, conn1: str | int, conn2: str | int):
-        pair = frozenset({conn1, conn2})
-        # set-Operation
-        self._connections.add(pair)
+        if self._undo is not None and frozenset({conn1, conn2}) not in self._connections:
+            self._undo.append(lambda: self.disconnect(conn1, conn2))
+
+        self._add_pair(conn1, conn2)
 
         # aktualisiere Connector-Objekte falls vorhanden
         c1 = self._find_connector(conn1)
@@ -69,75 +322,831 @@ class Flow:
         if c2:
             c2.connections.add(conn1)
 
+        self._record("connect", a=conn1, b=conn2)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator["Flow"]:
+        """
+        Group many mutations into one transaction.
+
+            with flow.batch():
+                for node in selection:
+                    flow.remove_node(node)
+
+        Removed nodes are dropped from the node list once at the end instead
+        of once per call, and the journal receives the records only when the
+        batch completes. If the block raises, every mutation made in it is
+        undone and the exception propagates. Nested batches belong to the
+        outermost one. The flow must not be run or saved inside a batch.
+        """
+        if self._undo is not None:
+            yield self
+            return
+
+        self._undo = []
+        self._batch_records = []
+        self._doomed = set()
+        try:
+            yield self
+        except BaseException:
+            undo, self._undo = self._undo, None
+            for step in reversed(undo):
+                step()
+            raise
+        else:
+            records = self._batch_records
+            self._batch_records = None
+            if self.journal is not None:
+                for op, data in records:
+                    self.journal.record(op, **data)
+        finally:
+            if self._doomed:
+                doomed = self._doomed
+                self._nodes = [node for node in self._nodes if node not in doomed]
+            self._undo = None
+            self._batch_records = None
+            self._doomed = None
+
+    def _record(self, op: str, **data):
+        if self._batch_records is not None:
+            self._batch_records.append((op, data))
+        elif self.journal is not None:
+            self.journal.record(op, **data)
+
+    def _restorer(self, node: NodeData) -> Callable[[], None]:
+        # undo step for remove_node: the node keeps its own connection sets,
+        # pairs known only from the other side and its position are saved here
+        pairs = [(conn.uuid, target) for conn in (node.inputs + node.outputs)
+                 for target in self._peers.get(conn.uuid, ())]
+        order = self._order[node]
+
+        def restore():
+            self.add_node(node)
+            self._order[node] = order
+            for a, b in pairs:
+                self._add_pair(a, b)
+                other = self._connectors.get(b)
+                if other is not None:
+                    other.connections.add(a)
+
+        return restore
+
+    def predecessors(self, node: NodeData) -> list[NodeData]:
+        """Nodes with an output linked to one of the inputs of `node`."""
+        return list(self._predecessors.get(node, ()))
+
+    def successors(self, node: NodeData) -> list[NodeData]:
+        """Nodes with an input linked to one of the outputs of `node`."""
+        return list(self._successors.get(node, ()))
+
     # helper for findig connection
     def _find_connector(self, uid: Union[str, int]) -> Connector | None:
-        for node in self._nodes:
-            for conn in (node.inputs + node.outputs):
-                if conn.uuid == uid:
-                    return conn
-        return None
+        return self._connectors.get(uid)
+
+    def _find_owner(self, uid: Union[str, int]) -> NodeData | None:
+        return self._owners.get(uid)
+
+    def _add_pair(self, a: Union[str, int], b: Union[str, int]):
+        pair = frozenset({a, b})
+        self._connections.add(pair)
+        self._peers.setdefault(a, set()).add(b)
+        self._peers.setdefault(b, set()).add(a)
+
+        if pair in self._edges:
+            return
+
+        # only output -> input pairs between known connectors form an edge
+        ca = self._connectors.get(a)
+        cb = self._connectors.get(b)
+        if ca is None or cb is None:
+            return
+
+        ta = getattr(ca, "type", None)
+        tb = getattr(cb, "type", None)
+        if ta == ConnectorType.OUTPUT and tb == ConnectorType.INPUT:
+            src, dst = self._owners[a], self._owners[b]
+        elif ta == ConnectorType.INPUT and tb == ConnectorType.OUTPUT:
+            src, dst = self._owners[b], self._owners[a]
+        else:
+            return
+
+        self._edges[pair] = (src, dst)
+        succ = self._successors[src]
+        succ[dst] = succ.get(dst, 0) + 1
+        pred = self._predecessors[dst]
+        pred[src] = pred.get(src, 0) + 1
+        self._plan = None
+
+    def _remove_pair(self, a: Union[str, int], b: Union[str, int]):
+        pair = frozenset({a, b})
+        self._connections.discard(pair)
+
+        peers = self._peers.get(a)
+        if peers is not None:
+            peers.discard(b)
+        peers = self._peers.get(b)
+        if peers is not None:
+            peers.discard(a)
+
+        edge = self._edges.pop(pair, None)
+        if edge is None:
+            return
+
+        src, dst = edge
+        succ = self._successors[src]
+        succ[dst] -= 1
+        if not succ[dst]:
+            del succ[dst]
+
+        pred = self._predecessors[dst]
+        pred[src] -= 1
+        if not pred[src]:
+            del pred[src]
+        self._plan = None
+
+    def plan(self) -> list[NodeData]:
+        """
+        Return the execution order of all nodes.
+
+        The order is computed with Kahn's algorithm; nodes that become ready at
+        the same time run in the order they were added to the flow. The result
+        is cached until the topology changes. Raises FlowCycleError if the
+        links contain a cycle.
+        """
+        if self._plan is not None:
+            return self._plan
+
+        in_degree = {node: len(self._predecessors[node]) for node in self._nodes}
+        ready = [(self._order[n], n) for n, d in in_degree.items() if d == 0]
+        heapq.heapify(ready)
+
+        order: list[NodeData] = []
+        while ready:
+            _, node = heapq.heappop(ready)
+            order.append(node)
+
+            for succ in self._successors[node]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    heapq.heappush(ready, (self._order[succ], succ))
+
+        if len(order) != len(self._nodes):
+            blocked = {n for n, d in in_degree.items() if d > 0}
+            raise FlowCycleError(self._find_cycle(blocked))
+
+        self._plan = order
+        return order
+
+    def _find_cycle(self, blocked: set[NodeData]) -> list[NodeData]:
+        # every blocked node has a blocked predecessor, so walking backwards
+        # has to revisit a node eventually
+        node = min(blocked, key=self._order.__getitem__)
+        seen: dict[NodeData, int] = {}
+        path: list[NodeData] = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(p for p in self._predecessors[node] if p in blocked)
+
+        cycle = path[seen[node]:]
+        cycle.reverse()
+        return cycle
+
+    def _inputs(self, node: NodeData, executed: dict[NodeData, tuple[dict, dict]],
+                live: dict[NodeData, frozenset[str] | None] | None = None) -> tuple[dict, dict]:
+        preds = self._predecessors[node]
+
+        # Take the globals and local from the predecessors
+        if not preds:
+            return self._initial, {}
+        if live is None and len(preds) == 1:
+            return executed[next(iter(preds))]
+
+        symbols = analyze(node)
+        if symbols.dynamic:
+            if len(preds) == 1:
+                return executed[next(iter(preds))]
+            return layer(*(ns for pred in preds for ns in executed[pred])), {}
+
+        if live is not None and live[node] is not None:
+            # only what the node reads or has to pass on downstream
+            return self._gather(node, preds, executed, symbols.reads | live[node], symbols.upstream), {}
+
+        # all predecessors, earlier linked ones take precedence
+        self._gather(node, preds, executed, symbols.reads, symbols.upstream)
+        return layer(*(ns for pred in preds for ns in executed[pred])), {}
+
+    def _gather(self, node: NodeData, preds: Iterable[NodeData], executed: dict[NodeData, tuple[dict, dict]],
+                names: Iterable[str], checked: frozenset[str]) -> dict:
+        # values of `names` from the first predecessor providing them; reports
+        # names in `checked` that other predecessors provide differently
+        inputs = {}
+        for name in names:
+            sources: list[tuple[NodeData, object]] = []
+            for pred in preds:
+                for namespace in executed[pred]:
+                    value = namespace.get(name, _MISSING)
+                    if value is not _MISSING:
+                        sources.append((pred, value))
+                        break
+            if not sources:
+                continue
+
+            value = inputs[name] = sources[0][1]
+            if name in checked and any(other is not value for _, other in sources[1:]):
+                self.conflicts.append(Conflict(node, name, [pred for pred, _ in sources]))
+        return inputs
+
+    def _liveness(self) -> dict[NodeData, frozenset[str] | None]:
+        # names every node has to pass on because a descendant reads them,
+        # None if a dynamic descendant may read any name
+        live: dict[NodeData, frozenset[str] | None] = {}
+        for node in reversed(self.plan()):
+            needed: set[str] | None = set()
+            for succ in self._successors[node]:
+                symbols = analyze(succ)
+                if symbols.dynamic or live[succ] is None:
+                    needed = None
+                    break
+                needed |= symbols.reads
+                needed |= live[succ]
+            live[node] = None if needed is None else frozenset(needed)
+        return live
+
+    def _execute(self, node: NodeData, g: dict, l: dict, pool: "WorkerPool | None" = None,
+                 plane: "DataPlane | None" = None) -> tuple[dict, dict]:
+        execute = node.execute if pool is None else (lambda g, l: pool.execute(node, g, l, plane=plane))
+
+        hooks = self.hooks
+        if not hooks:
+            return execute(g, l)
+
+        for hook in hooks:
+            hook.before(node)
+        try:
+            result = execute(g, l)
+        except BaseException as err:
+            for hook in hooks:
+                hook.after(node, None, err)
+            raise
+        for hook in hooks:
+            hook.after(node, result, None)
+        return result
+
+    async def _aexecute(self, node: NodeData, g: dict, l: dict) -> tuple[dict, dict]:
+        hooks = self.hooks
+        if not hooks:
+            return await node.aexecute(g, l)
+
+        for hook in hooks:
+            hook.before(node)
+        try:
+            result = await node.aexecute(g, l)
+        except BaseException as err:
+            for hook in hooks:
+                hook.after(node, None, err)
+            raise
+        for hook in hooks:
+            hook.after(node, result, None)
+        return result
+
+    def _cached(self, fingerprint: str, node: NodeData, executed: dict[NodeData, tuple[dict, dict]],
+                live: dict[NodeData, frozenset[str] | None] | None = None) -> tuple[dict, dict] | None:
+        # a hit is rebuilt over this run's inputs from a copy of the cached
+        # writes, so mutations downstream never reach the cache
+        entry = self.results.get(fingerprint)
+        if entry is None:
+            return None
+        g, l = self._inputs(node, executed, live)
+        return entry.thaw(g, l)
+
+    def _cache_hit(self, node: NodeData):
+        self.cache_hits.append(node)
+        for hook in self.hooks:
+            hook.cached(node)
+
+    def _fingerprint(self, node: NodeData, fingerprints: dict[NodeData, str],
+                     live: dict[NodeData, frozenset[str] | None] | None = None) -> str:
+        # covers the node's code and, through the predecessors, everything upstream;
+        # a pruned result also depends on the names read downstream
+        h = hashlib.sha256(str(node.code_hash).encode())
+        for pred in self._predecessors[node]:
+            h.update(fingerprints[pred].encode())
+        if live is not None:
+            names = live[node]
+            h.update(b"*" if names is None else "\0".join(sorted(names)).encode())
+        return h.hexdigest()
+
+    def _chain_key(self, chain: FusedChain, fingerprints: dict[NodeData, str]) -> str:
+        # the result of a chain holds the writes of every member, an entry
+        # of its last node run on its own only those of that node
+        h = hashlib.sha256(b"fused")
+        h.update(fingerprints[chain.last].encode())
+        for member in chain.members:
+            h.update(str(member.uuid).encode() + b"\0")
+        return h.hexdigest()
+
+    def _release(self, node: NodeData, executed: dict[NodeData, tuple[dict, dict]],
+                 consumers: dict[NodeData, int], plane: "DataPlane | None" = None):
+        # drop predecessor results once every successor has consumed them
+        for pred in self._predecessors[node]:
+            consumers[pred] -= 1
+            if consumers[pred] == 0:
+                result = executed.pop(pred, None)
+                if plane is not None and result is not None:
+                    plane.release(result[1])
+
+    def run(self, parallel: bool = False, workers: int | None = None, processes: bool = False,
+            incremental: bool = False, release: bool = False, pool: "WorkerPool | None" = None,
+            plane: "DataPlane | None" = None, fuse: bool = False, prune: bool = False,
+            inputs: Mapping | None = None):
+        """
+        Execute all nodes in topological order.
+
+        With `parallel=True` every node is dispatched to a pool as soon as all
+        of its predecessors finished. `workers` limits the pool size and
+        `processes=True` uses a process pool instead of threads, which
+        requires the namespaces to be picklable. If a node fails, its
+        descendants are not started; the first error is raised once the
+        remaining branches finished.
+
+        With `incremental=True` results are taken from `self.results` when
+        neither the node's code nor anything upstream changed since it was
+        last executed. The nodes served from the cache are listed in
+        `self.cache_hits` after the run. The cache keeps deep copies of the
+        values a node wrote, so downstream nodes mutating them cannot change
+        later runs; nodes whose values cannot be copied always run.
+
+        Namespaces are passed downstream as copy-on-write scopes. With
+        `release=True` a node's result is dropped from the returned dict as
+        soon as all of its successors ran, so only the results of sink nodes
+        are kept alive until the end of a long pipeline.
+
+        With a `WorkerPool` as `pool` every node runs isolated in one of its
+        warm worker processes, with the pool's timeout and memory limit.
+        Combined with `parallel=True` up to `pool.size` nodes run at once.
+
+        A `DataPlane` as `plane` passes large buffers to and from worker
+        processes through shared memory instead of pickling them. With
+        `release=True` a segment is freed once no kept result references
+        it, the others live until the plane is closed.
+
+        With `fuse=True` linear chains of nodes run as one fused code object
+        (see `fusion`); fusion cannot be combined with `parallel` or `pool`.
+        Errors and hooks still name the member node; only the last member of
+        a chain has an entry in the returned dict.
+
+        A node sees the names of all of its predecessors; where several
+        provide a name it reads with different values, the earliest linked
+        predecessor wins and the clash is listed in `self.conflicts`. With
+        `prune=True` a node only receives the names it reads or a descendant
+        needs (see `analysis`), so its result holds no other upstream values
+        and, with `release=True`, large objects nobody reads are freed as
+        soon as their producer's successors ran. Nodes using `eval`, `exec`,
+        `globals()` or similar get every name.
+
+        `inputs` is the namespace the root nodes start from instead of an
+        empty one, e.g. the parameters of one run of a sweep (see `sweep`).
+        """
+        if pool is not None and processes:
+            raise ValueError("Use either processes=True or a WorkerPool")
+        if fuse and (parallel or pool is not None):
+            raise ValueError("Fused chains only run sequentially without a WorkerPool")
+        if inputs and incremental:
+            raise ValueError("Incremental runs cannot take inputs, cached results do not depend on them")
+        self._initial = inputs or {}
+
+        self.cache_hits = []
+        self.conflicts = []
+        consumers = {node: len(self._successors[node]) for node in self._nodes} if release else None
+        live = self._liveness() if prune else None
+
+        if parallel:
+            return self._run_parallel(workers, processes, incremental, consumers, pool, plane, live)
 
-    def run(self):
         # Knoten und ihre Ausführungsergebnisse
-        remaining = set(self._nodes)
         executed: dict[NodeData, tuple[dict, dict]] = {}
-
-        # Für jeden Knoten Vorgänger aus Verbindungen ermitteln
-        predecessors: dict[NodeData, set[NodeData]] = {}
-        for node in self._nodes:
-            # Finde alle verbundenen Input-Connectors
-            pred_set = set()
-            for input in node.inputs:
-                for conn_id in input.connections:
-                    # Finde Quell-Connector und dessen Node
-                    source = self._find_connector(conn_id)
-                    if source and source.type == ConnectorType.OUTPUT:
-                        # Füge den Quell-Node zu Vorgängern hinzu
-                        source_node = next((n for n in self._nodes if source in n.outputs), None)
-                        if source_node:
-                            pred_set.add(source_node)
-            predecessors[node] = pred_set
+        fingerprints: dict[NodeData, str] = {}
+        chains = self._fused_chains() if fuse else {}
 
         # Execute in topological order
-        while remaining:
-            for node in list(remaining):
-                # Check if all predecessors where executed
-                preds = predecessors[node]
-                if all(p in executed for p in preds):
-                    # Take the globals and local from the predecessors
-                    if not preds:
-                        globals_dict, locals_dict = {}, {}
+        for node in self.plan():
+            chain = chains.get(node)
+            if chain is None:
+                self._run_node(node, executed, fingerprints, incremental, consumers, pool, plane, live)
+            elif node is chain.head:
+                self._run_chain(chain, executed, fingerprints, incremental, consumers, live)
+
+        return executed
+
+    def _run_node(self, node: NodeData, executed: dict[NodeData, tuple[dict, dict]], fingerprints: dict[NodeData, str],
+                  incremental: bool, consumers: dict[NodeData, int] | None, pool: "WorkerPool | None" = None,
+                  plane: "DataPlane | None" = None, live: dict[NodeData, frozenset[str] | None] | None = None):
+        if incremental:
+            fingerprint = fingerprints[node] = self._fingerprint(node, fingerprints, live)
+            cached = self._cached(fingerprint, node, executed, live)
+            if cached is not None:
+                executed[node] = cached
+                self._cache_hit(node)
+                if plane is not None:
+                    plane.retain(cached[1])
+                if consumers is not None:
+                    self._release(node, executed, consumers, plane)
+                return
+
+        globals_dict, locals_dict = self._inputs(node, executed, live)
+
+        # Execute nodes and store results
+        new_globals, new_locals = self._execute(node, globals_dict, locals_dict, pool, plane)
+        executed[node] = (new_globals, new_locals)
+
+        if incremental:
+            self.results.put(fingerprints[node], executed[node])
+        if plane is not None:
+            plane.retain(new_locals)
+        if consumers is not None:
+            self._release(node, executed, consumers, plane)
+
+    def _fused_chains(self) -> dict[NodeData, FusedChain]:
+        # found again whenever the plan changed, so chains follow every link
+        # change; chains that stayed the same keep their compiled code
+        order = self.plan()
+        if self._chains_plan is not order:
+            old = {tuple(chain.members): chain for chain in self._chains.values()}
+            self._chains = {}
+            for members in find_chains(self):
+                chain = old.get(tuple(members)) or FusedChain(members)
+                for member in members:
+                    self._chains[member] = chain
+            self._chains_plan = order
+        return self._chains
+
+    def _run_chain(self, chain: FusedChain, executed: dict[NodeData, tuple[dict, dict]],
+                   fingerprints: dict[NodeData, str], incremental: bool, consumers: dict[NodeData, int] | None,
+                   live: dict[NodeData, frozenset[str] | None] | None = None):
+        try:
+            chain.compile()
+        except SyntaxError:
+            # a member does not compile, run the members one by one so it fails on its own
+            for member in chain.members:
+                self._run_node(member, executed, fingerprints, incremental, consumers, live=live)
+            return
+
+        last = chain.last
+        if incremental:
+            for member in chain.members:
+                fingerprints[member] = self._fingerprint(member, fingerprints, live)
+            key = self._chain_key(chain, fingerprints)
+            cached = self._cached(key, chain.head, executed, live)
+            if cached is not None:
+                executed[last] = cached
+                for member in chain.members:
+                    self._cache_hit(member)
+                    if consumers is not None:
+                        self._release(member, executed, consumers)
+                return
+
+        # the liveness of the head covers the reads of all later members
+        g, l = self._inputs(chain.head, executed, live)
+        executed[last] = self._execute_chain(chain, g, l)
+
+        if incremental:
+            self.results.put(key, executed[last])
+        if consumers is not None:
+            for member in chain.members:
+                self._release(member, executed, consumers)
+
+    def _execute_chain(self, chain: FusedChain, g: dict, l: dict) -> tuple[dict, dict]:
+        hooks = self.hooks
+        members = chain.members
+        current = -1
+
+        def stage(i: int):
+            nonlocal current
+            if hooks:
+                if current >= 0:
+                    for hook in hooks:
+                        hook.after(members[current], None, None)
+                for hook in hooks:
+                    hook.before(members[i])
+            current = i
+
+        try:
+            result = chain.execute(g, l, stage)
+        except BaseException as err:
+            failed = members[max(current, 0)]
+            err.add_note(f"in node {failed.title} ({failed.uuid}), fused with {len(members) - 1} other nodes")
+            for hook in hooks:
+                hook.after(failed, None, err)
+            raise
+
+        for hook in hooks:
+            hook.after(chain.last, result, None)
+        return result
+
+    def _run_parallel(self, workers: int | None, processes: bool, incremental: bool,
+                      consumers: dict[NodeData, int] | None, pool: "WorkerPool | None" = None,
+                      plane: "DataPlane | None" = None, live: dict[NodeData, frozenset[str] | None] | None = None):
+        # imported lazily, concurrent.futures pulls in logging and multiprocessing
+        from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+        order = self.plan()
+        executed: dict[NodeData, tuple[dict, dict]] = {}
+        fingerprints: dict[NodeData, str] = {}
+        waiting = {node: len(self._predecessors[node]) for node in order}
+        error: BaseException | None = None
+
+        # with a WorkerPool the threads only wait for its workers
+        isolated = pool
+        if isolated is not None:
+            workers = workers or isolated.size
+
+        pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool_cls(max_workers=workers) as pool:
+            running: dict[Future, tuple[NodeData, dict, dict]] = {}
+
+            def finish(node: NodeData, result: tuple[dict, dict], ready: list[NodeData]):
+                executed[node] = result
+                if plane is not None:
+                    plane.retain(result[1])
+                if consumers is not None:
+                    self._release(node, executed, consumers, plane)
+                for succ in self._successors[node]:
+                    waiting[succ] -= 1
+                    if waiting[succ] == 0:
+                        ready.append(succ)
+
+            def dispatch(nodes: list[NodeData]):
+                nodes.sort(key=self._order.__getitem__)
+                while nodes:
+                    node = nodes.pop(0)
+
+                    if incremental:
+                        fingerprint = fingerprints[node] = self._fingerprint(node, fingerprints, live)
+                        cached = self._cached(fingerprint, node, executed, live)
+                        if cached is not None:
+                            self._cache_hit(node)
+                            finish(node, cached, nodes)
+                            continue
+
+                    g, l = self._inputs(node, executed, live)
+                    if processes:
+                        # hooks run here and on completion, the worker process has none
+                        for hook in self.hooks:
+                            hook.before(node)
+                        future = pool.submit(_execute_detached, node.uuid, node.code, _detach(g, plane),
+                                             _detach(l, plane), plane.threshold if plane is not None else None)
                     else:
-                        # Use the predecessors vars
-                        globals_dict, locals_dict = next(iter(executed[p] for p in preds))
+                        future = pool.submit(self._execute, node, g, l, isolated, plane)
+                    running[future] = (node, g, l)
+
+            dispatch([node for node in order if waiting[node] == 0])
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                ready: list[NodeData] = []
+                for future in done:
+                    node, g, l = running.pop(future)
+                    try:
+                        result = future.result()
+                    except BaseException as err:
+                        if processes:
+                            for hook in self.hooks:
+                                hook.after(node, None, err)
+
+                        # descendants of a failed node never become ready
+                        if error is None:
+                            error = err
+                        continue
+
+                    if processes:
+                        result = _reattach(g, l, result, plane)
+                        for hook in self.hooks:
+                            hook.after(node, result, None)
+                    if incremental:
+                        self.results.put(fingerprints[node], result)
+                    finish(node, result, ready)
 
-                    # Execute nodes and store results
-                    new_globals, new_locals = node.execute(globals_dict, locals_dict)
-                    executed[node] = (new_globals, new_locals)
-                    remaining.remove(node)
+                dispatch(ready)
+
+        if error is not None:
+            raise error
 
         return executed
 
+    async def arun(self, concurrency: int | None = None, incremental: bool = False, release: bool = False,
+                   prune: bool = False, inputs: Mapping | None = None):
+        """
+        Execute the flow on the running event loop.
+
+        Node code may use `await` at the top level. Every node starts as soon
+        as its predecessors finished, so nodes waiting on I/O overlap on a
+        single thread; `concurrency` limits how many run at once. Node code
+        without `await` runs synchronously and blocks the loop while it runs.
+        Incremental runs, `release`, `prune`, `inputs` and error handling
+        behave as in `run`.
+        """
+        import asyncio
+
+        if inputs and incremental:
+            raise ValueError("Incremental runs cannot take inputs, cached results do not depend on them")
+        self._initial = inputs or {}
+
+        order = self.plan()
+        self.cache_hits = []
+        self.conflicts = []
+        consumers = {node: len(self._successors[node]) for node in self._nodes} if release else None
+        live = self._liveness() if prune else None
+
+        executed: dict[NodeData, tuple[dict, dict]] = {}
+        fingerprints: dict[NodeData, str] = {}
+        waiting = {node: len(self._predecessors[node]) for node in order}
+        limit = asyncio.Semaphore(concurrency) if concurrency else None
+        running: dict[asyncio.Future, NodeData] = {}
+        error: BaseException | None = None
+
+        async def execute(node: NodeData, g: dict, l: dict):
+            if limit is None:
+                return await self._aexecute(node, g, l)
+            async with limit:
+                return await self._aexecute(node, g, l)
+
+        def finish(node: NodeData, result: tuple[dict, dict], ready: list[NodeData]):
+            executed[node] = result
+            if consumers is not None:
+                self._release(node, executed, consumers)
+            for succ in self._successors[node]:
+                waiting[succ] -= 1
+                if waiting[succ] == 0:
+                    ready.append(succ)
+
+        def dispatch(nodes: list[NodeData]):
+            nodes.sort(key=self._order.__getitem__)
+            while nodes:
+                node = nodes.pop(0)
+
+                if incremental:
+                    fingerprint = fingerprints[node] = self._fingerprint(node, fingerprints, live)
+                    cached = self._cached(fingerprint, node, executed, live)
+                    if cached is not None:
+                        self._cache_hit(node)
+                        finish(node, cached, nodes)
+                        continue
+
+                g, l = self._inputs(node, executed, live)
+                running[asyncio.ensure_future(execute(node, g, l))] = node
+
+        dispatch([node for node in order if waiting[node] == 0])
+
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            ready: list[NodeData] = []
+            for task in done:
+                node = running.pop(task)
+                try:
+                    result = task.result()
+                except BaseException as err:
+                    # descendants of a failed node never become ready
+                    if error is None:
+                        error = err
+                    continue
+
+                if incremental:
+                    self.results.put(fingerprints[node], result)
+                finish(node, result, ready)
+
+            dispatch(ready)
+
+        if error is not None:
+            raise error
+
+        return executed
+
+    def stream(self, buffer: int = 64):
+        """
+        Run the flow as a streaming pipeline, see `streaming.run_streaming`.
+
+        Nodes pass items with `emit(item)` and consume them with
+        `for item in stream`; at most `buffer` items are queued per node.
+        """
+        from nython.core.runtime.streaming import run_streaming
+        return run_streaming(self, buffer)
+
+    def sweep(self, params, workers: int | None = None, **options):
+        """Run the flow once per namespace in `params`, see `sweep.sweep`."""
+        from nython.core.runtime.sweep import sweep
+        return sweep(self, params, workers, **options)
+
     @classmethod
-    def load(cls, filename = "./_examples/flow.json") -> "Flow":
+    def load(cls, filename = "./_examples/flow.json", recover: bool = True) -> "Flow":
+        """
+        Load a flow from a JSON or binary flow file, the format is detected from the content.
+
+        With `recover=True` a journal left next to the file (see
+        `attach_journal`) is replayed, restoring edits that were never
+        compacted into the file.
+        """
         _flow = Flow()
+        _flow.filename = filename
 
-        with open(filename, "r") as file:
-            read_flow = json.loads(file.read())
+        # add_node indexes the connections of every node; pairs whose other
+        # side is loaded later are resolved as soon as that node is added
+        if binformat.is_binary(filename):
+            with open(filename, "rb") as file:
+                for new_node in binformat.iter_nodes(file):
+                    _flow.add_node(new_node)
+        else:
+            with open(filename, "r") as file:
+                read_flow = json.loads(file.read())
 
-        for node in read_flow:
-            new_node = NodeData.from_dict(node)
-            _flow.add_node(new_node)
+            for node in read_flow:
+                new_node = NodeData.from_dict(node)
+                _flow.add_node(new_node)
 
-        # rebuild connections set from connectors
-        for node in _flow._nodes:
-            for conn in (node.inputs + node.outputs):
-                for target in conn.connections:
-                    pair = frozenset({conn.uuid, target})
-                    _flow._connections.add(pair)
+        if recover:
+            for record in Journal.replay(_flow._journal_path()):
+                _flow._apply(record)
 
         return _flow
-    
-    def save(self, filename = "./flow.json"):
-        with open(filename, "w") as file:
-            file.write(json.dumps(self._nodes, default=lambda o: o.to_dict(), indent=4))
\ No newline at end of file
+
+    def _journal_path(self) -> str:
+        if self.filename is None:
+            raise ValueError("Flow has no file name, pass a journal path")
+        return self.filename + ".journal"
+
+    def _apply(self, record: dict):
+        # replays are idempotent, a record already contained in the snapshot is skipped
+        op = record.get("op")
+        if op == "add_node":
+            node = NodeData.from_dict(record["node"])
+            if node.uuid not in self._node_index:
+                self.add_node(node)
+        elif op == "remove_node":
+            if record["uuid"] in self._node_index:
+                self.remove_node_by_id(record["uuid"])
+        elif op == "connect":
+            self.connect(record["a"], record["b"])
+        elif op == "disconnect":
+            self.disconnect(record["a"], record["b"])
+        elif op == "update":
+            node = self._node_index.get(record["uuid"])
+            if node is not None:
+                changes = record["changes"]
+                self.update_node(
+                    node,
+                    code=changes["code"][1] if "code" in changes else None,
+                    title=changes["name"][1] if "name" in changes else None,
+                    pos=changes["pos"][1] if "pos" in changes else None,
+                    # edits are journaled as typed, they may not compile
+                    compile=False,
+                )
+
+    def attach_journal(self, path: str | None = None, fsync: bool = True) -> Journal:
+        """Record every following mutation in a journal, by default next to the flow file."""
+        self.journal = Journal(path or self._journal_path(), fsync)
+        return self.journal
+
+    def commit(self):
+        """
+        Persist all changes. With a journal only the edits since the last
+        commit are appended; once the journal holds `compact_after` records
+        it is compacted into a new snapshot. Without a journal the whole flow
+        is saved.
+        """
+        if self.journal is None:
+            self.save(self.filename or "./flow.json")
+            return
+
+        self.journal.flush()
+        if self.journal.records >= self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """Write a full snapshot of the flow and empty the journal."""
+        if self.journal is None:
+            self.save(self.filename or "./flow.json")
+            return
+
+        with self.journal.lock:
+            self.save(self.filename or "./flow.json")
+            self.journal.truncate()
+
+    def save(self, filename = "./flow.json", binary: bool | None = None):
+        """
+        Save the flow node by node. The binary format is used if `binary` is
+        set or, by default, if the file name ends with `binformat.SUFFIX`.
+        The file is replaced atomically, so a crash never leaves it half written.
+        """
+        if binary is None:
+            binary = filename.endswith(binformat.SUFFIX)
+
+        tmp = filename + ".tmp"
+        if binary:
+            with open(tmp, "wb") as file:
+                binformat.write_nodes(file, self._nodes)
+        else:
+            with open(tmp, "w") as file:
+                binformat.write_json_nodes(file, self._nodes)
+        os.replace(tmp, filename)
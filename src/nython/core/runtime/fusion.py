@@ -0,0 +1,117 @@
+"""
+Fusion of linear node chains into a single code object.
+
+A chain is a run of nodes in which every node has exactly one successor
+and that successor has exactly one predecessor. Its members pass their
+whole namespace to the next member anyway, so they can execute as one
+code object in one namespace, saving the per-node scheduling, scope and
+hook overhead. Before each member the fused code calls a stage function,
+which keeps track of the member that is running for error attribution and
+hooks. It is removed from the namespace again once the chain finished.
+"""
+from typing import TYPE_CHECKING, Callable
+
+from nython.core.runtime.namespace import layer
+from nython.core.runtime.node import NodeData
+
+from types import CodeType
+
+import ast
+import hashlib
+
+if TYPE_CHECKING:
+    from nython.core.runtime.flow import Flow
+
+STAGE = "__nython_stage__"
+
+
+def find_chains(flow: "Flow", min_length: int = 2) -> list[list[NodeData]]:
+    """Maximal linear chains of the flow with at least `min_length` members, in execution order."""
+    successors, predecessors = flow._successors, flow._predecessors
+
+    def continues(node: NodeData) -> bool:
+        # node is the inner end of a link between two chain members
+        preds = predecessors[node]
+        return len(preds) == 1 and len(successors[next(iter(preds))]) == 1
+
+    chains = []
+    for node in flow.plan():
+        if continues(node):
+            continue
+
+        chain = [node]
+        while len(successors[chain[-1]]) == 1:
+            succ = next(iter(successors[chain[-1]]))
+            if not continues(succ):
+                break
+            chain.append(succ)
+
+        if len(chain) >= min_length:
+            chains.append(chain)
+    return chains
+
+
+class FusedChain:
+    def __init__(self, members: list[NodeData]) -> None:
+        self.members: list[NodeData] = members
+
+        self._code: CodeType | None = None
+        self._key: str | None = None
+
+    @property
+    def head(self) -> NodeData:
+        return self.members[0]
+
+    @property
+    def last(self) -> NodeData:
+        return self.members[-1]
+
+    def reads(self) -> frozenset[str] | None:
+        """Names any member may read, None if one can reach any name."""
+        names: frozenset[str] = frozenset()
+        for member in self.members:
+            reads = member.reads()
+            if reads is None:
+                return None
+            names |= reads
+        return names
+
+    def _current_key(self) -> str:
+        h = hashlib.sha256()
+        for member in self.members:
+            h.update(member.code_hash.encode())
+        return h.hexdigest()
+
+    def compile(self) -> CodeType:
+        """Fused code of the members, rebuilt whenever one of them changed its code."""
+        key = self._current_key()
+        if self._code is not None and self._key == key:
+            return self._code
+
+        body: list[ast.stmt] = []
+        for i, member in enumerate(self.members):
+            stage = ast.Expr(ast.Call(ast.Name(STAGE, ast.Load()), [ast.Constant(i)], []))
+            body.append(ast.copy_location(stage, ast.Pass(lineno=1, col_offset=0)))
+            body.extend(ast.parse(member.code).body)
+
+        module = ast.fix_missing_locations(ast.Module(body, type_ignores=[]))
+        uuids = ", ".join(str(member.uuid) for member in self.members)
+        self._code = compile(module, f"<fused {uuids}>", "exec")
+        self._key = key
+        return self._code
+
+    def execute(self, _locals: dict, _globals: dict, stage: Callable[[int], None]) -> tuple[dict, dict]:
+        """Like `NodeData.execute` for the whole chain; `stage(i)` runs before member i."""
+        code = self.compile()
+
+        # one plain namespace for globals and locals, as in NodeData.execute
+        scope = layer(_locals, _globals)
+        resolved = scope.resolve(self.reads())
+        namespace = dict(resolved)
+        namespace[STAGE] = stage
+        try:
+            exec(code, namespace)
+        finally:
+            namespace.pop(STAGE, None)
+        scope.absorb(namespace, resolved)
+        return {}, scope
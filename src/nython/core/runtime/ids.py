@@ -0,0 +1,41 @@
+import threading
+
+
+class IdAllocator:
+    """
+    Hands out integer uuids for nodes and connectors of a flow.
+
+    Every uuid the flow sees is passed to `observe`, so after loading a file
+    the allocator continues above the largest integer uuid in it. String
+    uuids never collide with the integers handed out and are ignored.
+    """
+
+    def __init__(self, start: int = 1) -> None:
+        self._next: int = start
+        self._lock = threading.Lock()
+
+    @property
+    def peek(self) -> int:
+        """The uuid the next call to `next` returns."""
+        return self._next
+
+    def observe(self, uuid: str | int):
+        if isinstance(uuid, int) and not isinstance(uuid, bool) and uuid >= self._next:
+            with self._lock:
+                self._next = max(self._next, uuid + 1)
+
+    def next(self) -> int:
+        with self._lock:
+            value = self._next
+            self._next += 1
+            return value
+
+    def reserve(self, count: int) -> range:
+        """Reserve `count` consecutive uuids at once, e.g. for pasting or generating nodes."""
+        if count < 0:
+            raise ValueError("count must not be negative")
+
+        with self._lock:
+            start = self._next
+            self._next += count
+            return range(start, start + count)
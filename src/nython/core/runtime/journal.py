@@ -0,0 +1,107 @@
+from typing import Any, Iterator
+
+import json
+import os
+import threading
+
+
+class Journal:
+    """
+    Append-only log of flow mutations.
+
+    Mutations are buffered with `record` and appended to the journal file as
+    JSON lines by `flush`, so a save costs time proportional to the edits
+    since the last one. The file is replayed on top of the last snapshot of
+    the flow after a crash; `Flow.compact` writes a new snapshot and empties
+    the journal.
+    """
+
+    def __init__(self, path: str, fsync: bool = True) -> None:
+        self.path: str = path
+        self.fsync: bool = fsync
+
+        # number of records in the journal file since the last compaction
+        self.records: int = self._count(path)
+
+        self.lock = threading.RLock()
+        self._pending: list[str] = []
+        self._stop: threading.Event | None = None
+
+    @staticmethod
+    def _count(path: str) -> int:
+        try:
+            with open(path, "rb") as file:
+                return sum(1 for _ in file)
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, op: str, **data: Any):
+        line = json.dumps({"op": op, **data})
+        with self.lock:
+            self._pending.append(line)
+
+    def flush(self) -> int:
+        """Append all buffered records to the journal file, return their number."""
+        with self.lock:
+            if not self._pending:
+                return 0
+
+            with open(self.path, "a") as file:
+                file.write("\n".join(self._pending) + "\n")
+                file.flush()
+                if self.fsync:
+                    os.fsync(file.fileno())
+
+            count = len(self._pending)
+            self.records += count
+            self._pending.clear()
+            return count
+
+    def truncate(self):
+        """Drop buffered and written records, used once a snapshot covers them."""
+        with self.lock:
+            self._pending.clear()
+            with open(self.path, "w"):
+                pass
+            self.records = 0
+
+    @staticmethod
+    def replay(path: str) -> Iterator[dict]:
+        """Yield the records of a journal file; a torn last line is ignored."""
+        try:
+            file = open(path, "r")
+        except FileNotFoundError:
+            return
+
+        with file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
+
+    def start_autosave(self, interval: float = 5.0):
+        """Flush the journal every `interval` seconds on a background thread."""
+        if self._stop is not None:
+            return
+
+        stop = self._stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.flush()
+                except OSError as err:
+                    print("Autosave failed:", err)
+
+        threading.Thread(target=loop, name="nython-autosave", daemon=True).start()
+
+    def stop_autosave(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        self.flush()
@@ -0,0 +1,151 @@
+from typing import Any, Iterable, Mapping
+
+# a chain is collapsed into a single dict once it gets deeper than this,
+# which bounds lookup cost and drops values shadowed by later nodes
+MAX_DEPTH = 32
+
+_MISSING = object()
+_dict_get = dict.get
+_NO_HIDDEN: frozenset = frozenset()
+
+
+class Scope(dict):
+    """
+    Copy-on-write namespace of a single node execution.
+
+    The dict itself only holds the names written by the node. Reads of other
+    names fall through to the parent namespaces via `__missing__`, so passing
+    a namespace downstream never copies it. Deleting an inherited name hides
+    it without touching the parent. Plain dict methods (iteration, `len`,
+    `items`) see the own writes only; use `flatten` for every visible name.
+    """
+
+    def __init__(self, *parents: Mapping) -> None:
+        super().__init__()
+        self._hidden: set = set()
+
+        maps: list[tuple[Mapping, Any]] = [(self, self._hidden)]
+        seen = {id(self)}
+        for parent in parents:
+            for entry in _maps_of(parent):
+                if id(entry[0]) not in seen:
+                    seen.add(id(entry[0]))
+                    maps.append(entry)
+
+        # only the maps refer to the ancestors, after a collapse shadowed values can be freed
+        if len(maps) > MAX_DEPTH:
+            maps = [maps[0], (_merge(maps[1:]), _NO_HIDDEN)]
+
+        self._maps: list[tuple[Mapping, Any]] = maps
+
+    def __missing__(self, key):
+        if key in self._hidden:
+            raise KeyError(key)
+
+        for own, hidden in self._maps[1:]:
+            value = _dict_get(own, key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if key in hidden:
+                break
+        raise KeyError(key)
+
+    def __delitem__(self, key):
+        found = dict.__contains__(self, key)
+        if found:
+            dict.__delitem__(self, key)
+
+        if key not in self._hidden:
+            try:
+                self.__missing__(key)
+            except KeyError:
+                pass
+            else:
+                self._hidden.add(key)
+                found = True
+
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        try:
+            self.__missing__(key)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def writes(self) -> tuple[dict, set]:
+        """Return the names written and the inherited names deleted by the node."""
+        return dict(dict.items(self)), set(self._hidden)
+
+    def apply(self, own: dict, hidden: set):
+        """Replay writes recorded by `writes`, e.g. in another process."""
+        dict.update(self, own)
+        self._hidden.update(hidden)
+
+    def resolve(self, names: Iterable[str] | None) -> dict:
+        """Return a plain dict with the visible values of `names`, of every name if None."""
+        if names is None:
+            return self.flatten()
+        resolved = {}
+        for name in names:
+            value = self.get(name, _MISSING)
+            if value is not _MISSING:
+                resolved[name] = value
+        return resolved
+
+    def absorb(self, namespace: dict, resolved: dict):
+        """Record the changes code made to `namespace`, a copy of `resolved`, as writes of this scope."""
+        for name in resolved:
+            if name not in namespace:
+                del self[name]
+        for name, value in namespace.items():
+            if resolved.get(name, _MISSING) is not value:
+                dict.__setitem__(self, name, value)
+
+    @property
+    def depth(self) -> int:
+        return len(self._maps)
+
+    def flatten(self) -> dict:
+        """Return a plain dict with every name visible in this scope."""
+        return _merge(self._maps)
+
+    def __reduce__(self):
+        # pickled as a flat dict, the parent chain is not shared across processes
+        return (dict, (self.flatten(),))
+
+
+def _maps_of(namespace: Mapping) -> list[tuple[Mapping, Any]]:
+    if isinstance(namespace, Scope):
+        return namespace._maps
+    return [(namespace, _NO_HIDDEN)]
+
+
+def _merge(maps: list[tuple[Mapping, Any]]) -> dict:
+    merged: dict = {}
+    for own, hidden in reversed(maps):
+        for key in hidden:
+            merged.pop(key, None)
+        merged.update(dict.items(own) if isinstance(own, dict) else own.items())
+    return merged
+
+
+def layer(*parents: Mapping) -> Scope:
+    """Create a scope on top of `parents`, skipping namespaces without names."""
+    return Scope(*(p for p in parents if not _is_empty(p)))
+
+
+def _is_empty(namespace: Mapping) -> bool:
+    # a globals dict only filled by exec with __builtins__ adds nothing to a lookup
+    if isinstance(namespace, Scope):
+        return False
+    return not namespace or (len(namespace) == 1 and "__builtins__" in namespace)
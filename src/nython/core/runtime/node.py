@@ -1,5 +1,12 @@
 from types import CodeType
+from ast import PyCF_ALLOW_TOP_LEVEL_AWAIT
 from nython.core.runtime.connector import Connector, ConnectorType
+from nython.core.runtime.codecache import code_cache, source_hash
+from nython.core.runtime.namespace import layer
+from nython.core.runtime.analysis import analyze
+
+_BUILTINS = frozenset({"__builtins__"})
+
 
 class NodeData:
     def __init__(self, uuid: str|int, code:str) -> None:
@@ -7,40 +14,80 @@ class NodeData:
         self.code: str = code
         self.title: str = "Name"
 
+        # position in the editor canvas, None until the node was placed
+        self.pos: list[float] | None = None
+
         self.inputs: list[Connector] = []
         self.outputs: list[Connector] = []
 
-        self.code_hash: int = hash(self.code)
+        self.code_hash: str = source_hash(self.code)
         self._compiled_code: CodeType
+        self._compiled_hash: str | None = None
 
     def _compile(self):
-        self._compiled_code = compile(self.code, "<string>", "exec")
+        # code objects are shared through the content addressed cache
+        if self._compiled_hash == self.code_hash:
+            return
 
-    def set_code(self, code: str):
+        self._compiled_code = code_cache.compile(self.code, digest=self.code_hash)
+        self._compiled_hash = self.code_hash
+
+    def set_code(self, code: str, compile: bool = True):
+        """Store `code`; with `compile=False` it is compiled when the node runs, e.g. text still being typed."""
         self.code = code
+        self.code_hash = source_hash(self.code)
 
-        self._compile()
+        if compile:
+            self._compile()
 
-    def execute(self, _locals: dict, _globals: dict) -> tuple[dict, dict]:
-        print(f"Executing node {self.uuid}")
+    def reads(self) -> frozenset[str] | None:
+        """Names the code may read, None if it can reach any name."""
+        symbols = analyze(self)
+        return None if symbols.dynamic else symbols.reads | _BUILTINS
 
+    def execute(self, _locals: dict, _globals: dict) -> tuple[dict, dict]:
         self._compile()
 
-        # create isolated copies so caller's dicts remain unchanged
-        g = _globals.copy()
-        l = _locals.copy()
-        exec(self._compiled_code, g, l)
-        print(f"Executed node {self.uuid}")
-        return g, l
+        # writes land in a fresh scope layered over the inputs, so the
+        # caller's namespaces remain unchanged without copying them. The
+        # code runs in one plain dict holding the names it reads: class
+        # bodies look up globals without __missing__, and functions,
+        # lambdas and generator expressions resolve free names through
+        # their globals, so a Scope would hide the upstream names there
+        scope = layer(_locals, _globals)
+        resolved = scope.resolve(self.reads())
+        namespace = dict(resolved)
+        exec(self._compiled_code, namespace)
+        scope.absorb(namespace, resolved)
+        return {}, scope
+
+    async def aexecute(self, _locals: dict, _globals: dict) -> tuple[dict, dict]:
+        """Like `execute`, but the code may use `await` at the top level."""
+        code = code_cache.compile(self.code, flags=PyCF_ALLOW_TOP_LEVEL_AWAIT, digest=self.code_hash)
+
+        scope = layer(_locals, _globals)
+        resolved = scope.resolve(self.reads())
+        namespace = dict(resolved)
+
+        # code with top-level await evaluates to a coroutine, other code runs right away
+        result = eval(code, namespace)
+        if result is not None:
+            await result
+        scope.absorb(namespace, resolved)
+        return {}, scope
 
     def to_dict(self):
-        return {
+        data = {
             "name": self.title,
             "code": self.code,
             "uuid": self.uuid,
             "inputs": [in_conns.to_dict() for in_conns in self.inputs], 
             "outputs": [out_conns.to_dict() for out_conns in self.outputs]
         }
+        # optional, files of unplaced nodes stay as they were
+        if self.pos is not None:
+            data["pos"] = list(self.pos)
+        return data
     
     @staticmethod
     def from_dict(data: dict) -> "NodeData":
@@ -62,6 +109,10 @@ class NodeData:
         node = NodeData(uuid, code)
         node.title = title
 
+        pos = data.get("pos")
+        if pos is not None:
+            node.pos = [float(pos[0]), float(pos[1])]
+
         inputs = data.get("inputs", []) or []
         outputs = data.get("outputs", []) or []
 
@@ -0,0 +1,158 @@
+from typing import TYPE_CHECKING
+
+from nython.core.runtime.cache import namespace_size
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+if TYPE_CHECKING:
+    from nython.core.runtime.node import NodeData
+
+
+class RunHook:
+    """
+    Base class for hooks in `Flow.hooks`.
+
+    `before` and `after` are called around every node execution, on the
+    thread that executes the node (for process pools: on the dispatching
+    thread when the node is submitted and when its result arrives). `cached`
+    is called instead of both for nodes served from the result cache.
+    """
+
+    def before(self, node: "NodeData"):
+        pass
+
+    def after(self, node: "NodeData", result: tuple[dict, dict] | None, error: BaseException | None):
+        pass
+
+    def cached(self, node: "NodeData"):
+        pass
+
+
+class PrintHook(RunHook):
+    """Prints a line before and after each node, like the runtime used to do."""
+
+    def before(self, node: "NodeData"):
+        print(f"Executing node {node.uuid}")
+
+    def after(self, node: "NodeData", result: tuple[dict, dict] | None, error: BaseException | None):
+        if error is None:
+            print(f"Executed node {node.uuid}")
+        else:
+            print(f"Node {node.uuid} failed: {error!r}")
+
+
+class NodeProfile:
+    def __init__(self, node: "NodeData", thread: int, start: float) -> None:
+        self.uuid: str | int = node.uuid
+        self.title: str = node.title
+        self.thread: int = thread
+
+        # seconds, start relative to the profiler's origin
+        self.start: float = start
+        self.wall: float = 0.0
+        self.cpu: float = 0.0
+
+        # bytes allocated at the node's peak beyond what was allocated before it
+        self.peak_alloc: int | None = None
+        self.names: int = 0
+        self.namespace_bytes: int = 0
+        self.cached: bool = False
+        self.error: str | None = None
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class Profiler(RunHook):
+    """
+    Collects wall time, CPU time, peak allocation and namespace size per node.
+
+    CPU time is measured per thread. With `memory=True` tracemalloc is
+    started and the peak of each node is recorded; tracemalloc tracks the
+    whole process, so peaks of nodes running concurrently overlap.
+    """
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory: bool = memory
+        self.profiles: list[NodeProfile] = []
+
+        self._origin = time.perf_counter()
+        self._running: dict[tuple[int, "NodeData"], tuple[float, float, int]] = {}
+        self._lock = threading.Lock()
+
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def before(self, node: "NodeData"):
+        # the peak is relative to what was allocated when the node started,
+        # values still alive from earlier nodes do not count
+        start_alloc = 0
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_alloc = tracemalloc.get_traced_memory()[0]
+
+        key = (threading.get_ident(), node)
+        self._running[key] = (time.perf_counter(), time.thread_time(), start_alloc)
+
+    def after(self, node: "NodeData", result: tuple[dict, dict] | None, error: BaseException | None):
+        wall_end, cpu_end = time.perf_counter(), time.thread_time()
+        thread = threading.get_ident()
+        wall_start, cpu_start, start_alloc = self._running.pop((thread, node))
+
+        profile = NodeProfile(node, thread, wall_start - self._origin)
+        profile.wall = wall_end - wall_start
+        profile.cpu = cpu_end - cpu_start
+
+        if self.memory:
+            profile.peak_alloc = max(0, tracemalloc.get_traced_memory()[1] - start_alloc)
+        if result is not None:
+            own = result[1]
+            profile.names = len(own)
+            profile.namespace_bytes = namespace_size(own)
+        if error is not None:
+            profile.error = repr(error)
+
+        with self._lock:
+            self.profiles.append(profile)
+
+    def cached(self, node: "NodeData"):
+        profile = NodeProfile(node, threading.get_ident(), time.perf_counter() - self._origin)
+        profile.cached = True
+        with self._lock:
+            self.profiles.append(profile)
+
+    def summary(self, top: int = 10) -> list[dict]:
+        """The `top` slowest nodes by wall time."""
+        ranked = sorted(self.profiles, key=lambda p: p.wall, reverse=True)
+        return [p.to_dict() for p in ranked[:top]]
+
+    def chrome_trace(self) -> dict:
+        """Trace in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for p in self.profiles:
+            events.append({
+                "name": f"{p.title} ({p.uuid})",
+                "cat": "cached" if p.cached else "node",
+                "ph": "X",
+                "ts": p.start * 1e6,
+                "dur": p.wall * 1e6,
+                "pid": pid,
+                "tid": p.thread,
+                "args": {
+                    "cpu_ms": p.cpu * 1e3,
+                    "peak_alloc": p.peak_alloc,
+                    "names": p.names,
+                    "namespace_bytes": p.namespace_bytes,
+                    "error": p.error,
+                },
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
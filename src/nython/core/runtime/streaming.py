@@ -0,0 +1,144 @@
+from collections import deque
+from typing import TYPE_CHECKING, Any, Iterator
+
+from nython.core.runtime.connector import ConnectorType
+from nython.core.runtime.node import NodeData
+
+import threading
+
+if TYPE_CHECKING:
+    from nython.core.runtime.flow import Flow
+
+
+class StreamClosed(Exception):
+    """Raised by `emit` once every consumer of a node stopped reading."""
+
+
+class Channel:
+    """
+    Bounded queue between streaming nodes.
+
+    `put` blocks while `maxsize` items are buffered, which throttles fast
+    producers to the speed of their consumer. Iteration ends once every
+    producer called `finish`. A consumer that stops early calls `close`, after
+    which puts are dropped instead of blocking forever.
+    """
+
+    def __init__(self, maxsize: int, producers: int) -> None:
+        self.maxsize: int = maxsize
+        self._producers: int = producers
+        self._items: deque = deque()
+        self._closed: bool = False
+        self._cond = threading.Condition()
+
+    def put(self, item: Any) -> bool:
+        with self._cond:
+            while len(self._items) >= self.maxsize and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return False
+
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def finish(self):
+        with self._cond:
+            self._producers -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            with self._cond:
+                while not self._items and self._producers > 0:
+                    self._cond.wait()
+                if not self._items:
+                    return
+
+                item = self._items.popleft()
+                self._cond.notify_all()
+            yield item
+
+
+def run_streaming(flow: "Flow", buffer: int = 64) -> dict[NodeData, tuple[dict, dict]]:
+    """
+    Run all nodes of `flow` concurrently as a pipeline.
+
+    Every node runs on its own thread. Its namespace provides `emit(item,
+    output=None)` to send an item to the nodes linked to its outputs (all of
+    them, or a single one given by index or connector uuid), and `stream`, an
+    iterator over the items arriving on its inputs. Between two nodes at most
+    `buffer` items are queued, so peak memory depends on the buffer size and
+    not on the number of items. Upstream namespaces are not inherited, since
+    predecessors are still running when a node starts.
+
+    When all consumers of a node stopped reading, its next `emit` raises
+    StreamClosed, which ends the node quietly; such nodes have no entry in
+    the returned dict.
+    """
+    nodes = flow.plan()
+
+    # one inbound channel per node, fed by every edge ending at the node
+    inbound = {node: Channel(buffer, sum(flow._predecessors[node].values())) for node in nodes}
+
+    # built from the resolved edges like the producer counts, a link may
+    # be listed on one of its connectors only
+    routes: dict[NodeData, dict[str | int, list[Channel]]] = {
+        node: {conn.uuid: [] for conn in node.outputs} for node in nodes
+    }
+    for pair, (src, dst) in flow._edges.items():
+        output = next(uuid for uuid in pair if flow._connectors[uuid].type == ConnectorType.OUTPUT)
+        routes[src][output].append(inbound[dst])
+
+    executed: dict[NodeData, tuple[dict, dict]] = {}
+    errors: list[BaseException] = []
+
+    def work(node: NodeData):
+        by_output = routes[node]
+        everything = [channel for targets in by_output.values() for channel in targets]
+
+        def emit(item: Any, output: int | str | None = None):
+            if output is None:
+                targets = everything
+            elif isinstance(output, int) and output not in by_output:
+                targets = by_output[node.outputs[output].uuid]
+            else:
+                targets = by_output[output]
+
+            delivered = False
+            for channel in targets:
+                delivered = channel.put(item) or delivered
+
+            if targets and not delivered:
+                raise StreamClosed(f"All consumers of node {node.uuid} stopped")
+
+        try:
+            executed[node] = flow._execute(node, {}, {"emit": emit, "stream": iter(inbound[node])})
+        except StreamClosed:
+            # nobody reads the output anymore, the producer just stops
+            pass
+        except BaseException as err:
+            errors.append(err)
+        finally:
+            # unblock producers feeding this node and end the consumers' streams
+            inbound[node].close()
+            for channel in everything:
+                channel.finish()
+
+    threads = [threading.Thread(target=work, args=(node,), name=f"nython-stream-{node.uuid}", daemon=True)
+               for node in nodes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return {node: executed[node] for node in nodes if node in executed}
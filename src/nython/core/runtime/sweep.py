@@ -0,0 +1,167 @@
+"""
+Parameter sweeps: one flow, many runs with different initial namespaces.
+
+The flow is loaded and planned once. Every worker process rebuilds it once
+from the node data, so each node is compiled once per worker and the plan
+is reused for all runs the worker executes. The parameters of a run are
+injected into the root nodes (`Flow.run(inputs=...)`). Results stream out
+in completion order while at most a few runs per worker are in flight, so
+neither the parameter iterable nor the results are held in memory as a
+whole.
+"""
+from typing import Any, Iterable, Iterator, Mapping
+
+from nython.core.runtime.flow import Flow
+from nython.core.runtime.node import NodeData
+
+from types import FunctionType, ModuleType
+
+import itertools
+import traceback
+
+# Runs je Worker, die gleichzeitig unterwegs sind
+IN_FLIGHT_PER_WORKER = 2
+
+
+class SweepResult:
+    """
+    Outcome of one run: `values` holds the names visible in the sink nodes
+    (or only `outputs`), `error` the formatted exception of a failed run.
+    """
+
+    def __init__(self, index: int, params: Mapping, values: dict[str, Any] | None = None,
+                 error: str | None = None) -> None:
+        self.index: int = index
+        self.params: Mapping = params
+        self.values: dict[str, Any] | None = values
+        self.error: str | None = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"SweepResult({self.index}, error={self.error.splitlines()[-1]!r})"
+        return f"SweepResult({self.index}, {sorted(self.values or ())})"
+
+
+def _collect(flow: Flow, executed: dict, outputs: tuple[str, ...] | None) -> dict[str, Any]:
+    # values of the sink nodes; earlier sinks in the execution order win
+    values: dict[str, Any] = {}
+    for node in flow.plan():
+        if flow._successors[node] or node not in executed:
+            continue
+
+        g, l = executed[node]
+        for namespace in (l, g):
+            if hasattr(namespace, "flatten"):
+                namespace = namespace.flatten()
+            for name, value in namespace.items():
+                if name in values:
+                    continue
+                if outputs is not None:
+                    if name in outputs:
+                        values[name] = value
+                elif not name.startswith("__") and not isinstance(value, (ModuleType, FunctionType, type)):
+                    values[name] = value
+    return values
+
+
+class _Runner:
+    # the flow of one process, rebuilt once and reused for every run
+
+    def __init__(self, nodes: list[dict], outputs: tuple[str, ...] | None, options: Mapping) -> None:
+        self.flow = Flow()
+        for data in nodes:
+            self.flow.add_node(NodeData.from_dict(data))
+        self.flow.plan()
+        self.outputs = outputs
+        self.options = options
+
+    def __call__(self, index: int, params: Mapping) -> SweepResult:
+        try:
+            executed = self.flow.run(inputs=params, **self.options)
+            return SweepResult(index, params, _collect(self.flow, executed, self.outputs))
+        except Exception:
+            return SweepResult(index, params, error=traceback.format_exc())
+
+
+_runner: _Runner | None = None
+
+
+def _init_worker(nodes: list[dict], outputs: tuple[str, ...] | None, options: Mapping):
+    global _runner
+    _runner = _Runner(nodes, outputs, options)
+
+
+def _run_in_worker(index: int, params: Mapping) -> SweepResult:
+    assert _runner is not None
+    return _runner(index, params)
+
+
+def sweep(flow: Flow | str, params: Iterable[Mapping], workers: int | None = None,
+          outputs: Iterable[str] | None = None, processes: bool = True,
+          start_method: str | None = None, **options) -> Iterator[SweepResult]:
+    """
+    Run `flow` (a Flow or a flow file) once per namespace in `params` and
+    yield a `SweepResult` per run as soon as it finished.
+
+    Runs are spread over `workers` processes, by default one per CPU;
+    `processes=False` runs them one after another in this process. With
+    `outputs` only these names are collected from the sink nodes, otherwise
+    every name except modules, functions, classes and dunder names. Further
+    keyword arguments, e.g. `fuse=True` or `prune=True`, are passed to
+    `Flow.run`. A failing run yields a result with `error` set, the sweep
+    goes on.
+    """
+    if isinstance(flow, str):
+        flow = Flow.load(flow)
+    # raises FlowCycleError before any run starts
+    flow.plan()
+
+    if options.get("incremental"):
+        raise ValueError("Sweeps cannot run incrementally, every run has other inputs")
+
+    wanted = tuple(outputs) if outputs is not None else None
+    nodes = [node.to_dict() for node in flow._nodes]
+
+    if not processes:
+        runner = _Runner(nodes, wanted, options)
+        for index, namespace in enumerate(params):
+            yield runner(index, namespace)
+        return
+
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or multiprocessing.cpu_count()
+    context = multiprocessing.get_context(start_method)
+    pending = enumerate(params)
+
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(nodes, wanted, options)) as pool:
+        running: dict = {}
+
+        def submit(count: int):
+            # bounded submission, the params iterable is consumed lazily
+            for index, namespace in itertools.islice(pending, count):
+                running[pool.submit(_run_in_worker, index, namespace)] = (index, namespace)
+
+        try:
+            submit(workers * IN_FLIGHT_PER_WORKER)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, namespace = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as err:
+                        # e.g. values that cannot be pickled, the run failed but not the sweep
+                        result = SweepResult(index, namespace, error=f"Cannot receive run {index}: {err!r}")
+                    yield result
+                submit(len(done))
+        finally:
+            # the consumer stopped early or a worker died
+            for future in running:
+                future.cancel()
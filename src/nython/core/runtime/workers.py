@@ -0,0 +1,194 @@
+"""
+Isolated node execution in a pool of warm worker processes.
+
+Workers are started once, import the configured modules up front and then
+execute one node after another, so a dispatch costs a pipe round trip
+instead of a process start. A node that exceeds its timeout or crashes its
+worker only loses that worker; it is replaced and the error is raised in
+the calling thread. Workers are recycled after `max_tasks` nodes, which
+bounds what leaking node code can accumulate.
+"""
+from typing import TYPE_CHECKING, Iterable
+
+import importlib
+import multiprocessing
+import threading
+
+if TYPE_CHECKING:
+    from nython.core.runtime.node import NodeData
+    from nython.core.runtime.dataplane import DataPlane
+
+
+class NodeTimeout(TimeoutError):
+    """Raised when a node runs longer than the timeout of the pool."""
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised when the worker process executing a node died."""
+
+
+def _limit_memory(limit: int):
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows, the limit is not enforced there
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(conn, memory_limit: int | None, preload: tuple[str, ...]):
+    from nython.core.runtime.flow import _execute_detached
+
+    if memory_limit is not None:
+        _limit_memory(memory_limit)
+    for module in preload:
+        importlib.import_module(module)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        try:
+            reply = ("ok", _execute_detached(*task))
+        except BaseException as err:
+            reply = ("error", err)
+
+        try:
+            conn.send(reply)
+        except Exception as err:
+            # result or exception could not be pickled
+            conn.send(("error", RuntimeError(f"Cannot send node result: {err!r}")))
+
+
+class _Worker:
+    def __init__(self, context, memory_limit: int | None, preload: tuple[str, ...]) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, memory_limit, preload),
+                                       name="nython-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks: int = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pool of `size` warm worker processes for `Flow.run(pool=...)`.
+
+    `timeout` is the default limit in seconds per node, `memory_limit` the
+    address space limit in bytes per worker (POSIX only) and `max_tasks` the
+    number of nodes after which a worker is replaced. `preload` names
+    modules imported by every worker before its first node.
+
+    Namespaces are sent to the workers, so they have to be picklable.
+    """
+
+    def __init__(self, size: int | None = None, timeout: float | None = None, memory_limit: int | None = None,
+                 max_tasks: int | None = 100, preload: Iterable[str] = (), start_method: str | None = None) -> None:
+        self.size: int = size or multiprocessing.cpu_count()
+        self.timeout: float | None = timeout
+        self.memory_limit: int | None = memory_limit
+        self.max_tasks: int | None = max_tasks
+        self.preload: tuple[str, ...] = tuple(preload)
+
+        self._context = multiprocessing.get_context(start_method)
+
+        # workers may create shared memory segments for a DataPlane
+        from nython.core.runtime.dataplane import share_tracker
+        share_tracker()
+        self._idle: list[_Worker] = []
+        self._available = threading.Condition()
+        self._closed = False
+
+        for _ in range(self.size):
+            self._idle.append(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.memory_limit, self.preload)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            workers, self._idle = self._idle, []
+            self._available.notify_all()
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self) -> _Worker:
+        with self._available:
+            while not self._idle:
+                if self._closed:
+                    raise RuntimeError("WorkerPool is closed")
+                self._available.wait()
+            if self._closed:
+                raise RuntimeError("WorkerPool is closed")
+            return self._idle.pop()
+
+    def _release(self, worker: _Worker, broken: bool = False):
+        if broken or (self.max_tasks is not None and worker.tasks >= self.max_tasks):
+            worker.stop(kill=broken)
+            worker = self._spawn()
+
+        with self._available:
+            if self._closed:
+                worker.stop()
+                return
+            self._idle.append(worker)
+            self._available.notify()
+
+    def execute(self, node: "NodeData", g: dict, l: dict, timeout: float | None = None,
+                plane: "DataPlane | None" = None) -> tuple[dict, dict]:
+        """Execute `node` in a worker, the result matches `NodeData.execute`."""
+        from nython.core.runtime.flow import _detach, _reattach
+
+        timeout = self.timeout if timeout is None else timeout
+        threshold = plane.threshold if plane is not None else None
+        task = (node.uuid, node.code, _detach(g, plane), _detach(l, plane), threshold)
+
+        worker = self._acquire()
+        broken = True
+        try:
+            worker.conn.send(task)
+            worker.tasks += 1
+
+            if not worker.conn.poll(timeout):
+                raise NodeTimeout(f"Node {node.uuid} did not finish within {timeout} seconds")
+
+            try:
+                status, value = worker.conn.recv()
+            except EOFError:
+                worker.process.join(1)
+                raise WorkerCrashed(f"Worker died while executing node {node.uuid} "
+                                    f"(exit code {worker.process.exitcode})") from None
+
+            # a worker that ran out of memory is not trusted with the next node
+            broken = isinstance(value, MemoryError)
+        finally:
+            self._release(worker, broken)
+
+        if status == "error":
+            raise value
+        return _reattach(g, l, value, plane)
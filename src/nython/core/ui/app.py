@@ -0,0 +1,51 @@
+from nython.core.ui.editor import NodeEditor
+from nython.core.ui.theming import get_theme, load_font
+
+from inspect import getsourcefile
+from os.path import abspath
+
+import os
+
+import dearpygui.dearpygui as dpg
+
+
+def launch(flow_path: str | None = None):
+    # Redirect all print statements to a log file
+    log_file = open("app.log", "a")
+    # sys.stdout = log_file
+
+    dpg.create_context()
+    dpg.configure_app(docking=False, docking_space=False)
+    dpg.create_viewport(title='Nython Editor', width=1280, height=720, decorated=True)
+
+    # Import path for font file
+    package_dir = os.path.dirname(os.path.dirname(os.path.dirname(abspath(getsourcefile(lambda:0)))))
+    path = package_dir + "/res/OpenSans-Regular.ttf"
+    example_path = package_dir + "/_examples/flow.json"
+
+    print("Import font from", path)
+
+    load_font(path)
+
+    # the bundled example is never written to, Ctrl+S saves a copy to ./flow.json
+    editor_args = (flow_path,) if flow_path else (example_path, "./flow.json")
+    with NodeEditor(*editor_args) as editor:
+        theme = get_theme()
+        dpg.bind_theme(theme)
+
+        dpg.set_primary_window(editor.window_tag, True)
+
+    dpg.setup_dearpygui()
+    dpg.show_viewport()
+
+    # manual render loop, so progress of background runs is applied every frame
+    while dpg.is_dearpygui_running():
+        editor.poll()
+        dpg.render_dearpygui_frame()
+
+    # buffered journal records would be lost otherwise
+    editor.close()
+
+    dpg.destroy_context()
+
+    log_file.close()
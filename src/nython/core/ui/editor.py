@@ -1,19 +1,39 @@
 from nython.core.runtime.node import NodeData
-from nython.core.runtime.flow import Flow
-from nython.core.runtime.connector import Connector, ConnectorType
-from nython.core.ui.node import IMGuiNode
-
-from nython.util.uuid import get_uuid
+from nython.core.runtime.flow import Flow, FlowCycleError
+from nython.core.runtime.connector import ConnectorType
+from nython.core.runtime.profiling import PrintHook
+from nython.core.runtime.background import BackgroundRun, RunEvent
+from nython.core.runtime.compiler import CompileResult, CompileService, Diagnostic
+from nython.core.ui.node import IMGuiNode, connector_tag, node_tag
+from nython.core.ui.viewport import SpatialGrid, auto_layout
 
 import dearpygui.dearpygui as dpg
 
+# Nodes within this distance of the visible canvas get UI items, twice as
+# far away they are removed again
+VIEW_MARGIN = 400.0
+
+# rough size of a node, its position is the top left corner
+NODE_EXTENT = (260.0, 220.0)
+
+# upper bound of nodes built per frame, panning far spreads the work over frames
+BUILD_PER_FRAME = 100
+
 class NodeEditor:
-    def __init__(self, path="flow.json") -> None:
+    def __init__(self, path="flow.json", save_as: str | None = None) -> None:
         # Imgui Stuff
         self.editor_tag = "_editor"
 
-        # Load Runtime Layer
-        self.flow: Flow = Flow.load(path)
+        # Load Runtime Layer. With `save_as` (e.g. for the bundled example,
+        # which may be read-only) the flow is saved there with Ctrl+S and not
+        # journaled; otherwise edits are journaled next to the flow file and autosaved
+        self.flow: Flow = Flow.load(path, recover=save_as is None)
+        if save_as is not None:
+            self.flow.filename = save_as
+        else:
+            self.flow.attach_journal()
+            self.flow.journal.start_autosave()
+        self.flow.hooks.append(PrintHook())
 
         self.window_tag = "_window"
         self.settings_tag = "_settings"
@@ -21,6 +41,33 @@ class NodeEditor:
         self.create_node_popup_tag = "create_node_popup"
         self.create_node_input_tag = "create_node_input"
 
+        # UI nodes by node uuid, only for nodes near the visible canvas
+        self.ui_nodes: dict[str | int, IMGuiNode] = {}
+
+        # canvas positions of all nodes and the dpg links between shown nodes
+        self.grid: SpatialGrid = SpatialGrid()
+        self.links: dict[frozenset[str | int], int | str] = {}
+
+        # screen minus canvas position, see visible_region()
+        self._pan: tuple[float, float] = (0.0, 0.0)
+
+        # last execution state per node, applied when a node is shown again
+        self.states: dict[str | int, str] = {}
+
+        # dpg alias -> runtime uuid of nodes and connectors
+        self.tags: dict[str, str | int] = {}
+
+        # flow run on a worker thread, see poll()
+        self.runner: BackgroundRun | None = None
+
+        # the flow stores and journals the text of every edit, compiled off
+        # the UI thread; code that does not compile keeps its diagnostic until fixed
+        self.compiler: CompileService = CompileService()
+        self.diagnostics: dict[str | int, Diagnostic] = {}
+
+        # edits made during a background run, stored in the flow once it is over
+        self.edits: dict[str | int, tuple[NodeData, str]] = {}
+
     def __enter__(self):
         # Main editor window
         with dpg.window(label="Nython Editor", tag=self.window_tag, no_collapse=True, no_close=True, no_title_bar=True, no_move=True):
@@ -32,29 +79,17 @@ class NodeEditor:
             dpg.add_input_text(tag=self.create_node_input_tag, default_value="New Node")
 
             def _create_node_cb(sender, app_data):
+                if self.busy("create a node"):
+                    return
                 name = dpg.get_value(self.create_node_input_tag)
 
-                input_tag = get_uuid()
-                output_tag = get_uuid()
-
-                node_tag = get_uuid()
-
-                data = NodeData(node_tag, "")
-                data.title = name
-
-                in_conn = Connector(input_tag)
-                in_conn.type = ConnectorType.INPUT
-
-                out_conn = Connector(output_tag)
-                out_conn.type = ConnectorType.OUTPUT
+                # uuids come from the flow, the UI only derives its tags from them
+                data = self.flow.create_node(name)
 
-                data.inputs = [in_conn]
-                data.outputs = [out_conn]
-
-                node = IMGuiNode(self.editor_tag, data)
-                node.show()
-
-                self.flow.add_node(data)
+                x0, y0, x1, y1 = self.visible_region()
+                self.flow.update_node(data, pos=[(x0 + x1) / 2, (y0 + y1) / 2])
+                self.grid.insert(data.uuid, *data.pos)
+                self.materialize(data)
 
                 # Close the Popup in case the node was created sucessfully
                 dpg.configure_item(self.create_node_popup_tag, show=False)
@@ -73,39 +108,169 @@ class NodeEditor:
 
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
+        # Only the positions are indexed here; UI items are built lazily by
+        # update_view() for the nodes near the visible canvas
+        auto_layout(self.flow)
         for node in self.flow._nodes:
-            ui_node = IMGuiNode(self.editor_tag, node)
+            self.grid.insert(node.uuid, *node.pos)
+
+        self.update_view()
+
+    def close(self):
+        """Stop background work and persist edits still buffered in the journal."""
+        if self.runner is not None and self.runner.running:
+            self.runner.cancel()
+            self.runner.join()
+
+        self.store_edits()
+        self.apply_compiled(self.compiler.flush())
+        self.compiler.close()
+
+        if self.flow.journal is not None:
+            self.flow.journal.stop_autosave()
+            self.flow.commit()
+
+    def register(self, ui_node: IMGuiNode):
+        self.ui_nodes[ui_node._data.uuid] = ui_node
+        self.tags.update(ui_node.tags())
+
+    def materialize(self, node: NodeData):
+        """Build the UI items of a node and the links to other shown nodes."""
+        pending = self.edits.get(node.uuid)
+        ui_node = IMGuiNode(self.editor_tag, node, on_code=self.edit_code,
+                            code=pending[1] if pending is not None else None)
+
+        try:
+            ui_node.show()
+        except Exception as err:
+            print("error while loading node:", err)
+            return
 
-            try:
-                ui_node.show()
-            except Exception as err:
-                print("error while loading node:", err)
+        self.register(ui_node)
+        if node.uuid in self.states:
+            ui_node.set_state(self.states[node.uuid])
+        if node.uuid in self.diagnostics:
+            ui_node.set_diagnostic(self.diagnostics[node.uuid])
+
+        # Links kommen aus dem Index der flow, nicht aus einem Scan aller Paare
+        for conn in (node.inputs + node.outputs):
+            for peer in self.flow._peers.get(conn.uuid, ()):
+                self.add_link(conn.uuid, peer)
+
+    def dematerialize(self, uuid: str | int):
+        """Delete the UI items of a node, the flow keeps the node."""
+        ui_node = self.ui_nodes.pop(uuid, None)
+        if ui_node is None:
+            return
+
+        aliases = ui_node.tags()
+        conns = {conn for tag, conn in aliases.items() if tag != node_tag(uuid)}
+
+        # only links between shown nodes exist, so this stays small
+        for pair in [pair for pair in self.links if pair & conns]:
+            link = self.links.pop(pair)
+            if dpg.does_item_exist(link):
+                dpg.delete_item(link)
+
+        for alias in aliases:
+            self.tags.pop(alias, None)
+        dpg.delete_item(node_tag(uuid))
+
+    def add_link(self, a: str | int, b: str | int):
+        pair = frozenset({a, b})
+        if pair in self.links:
+            return
+
+        # beide Seiten brauchen UI-Items
+        if connector_tag(a) not in self.tags or connector_tag(b) not in self.tags:
+            return
+
+        ca = self.flow._find_connector(a)
+        cb = self.flow._find_connector(b)
+
+        # beide Connector-Objekte müssen vorhanden sein
+        if ca is None or cb is None:
+            return
+
+        # bestimme Richtung: add_node_link(output_attr, input_attr, ...)
+        if ca.type == ConnectorType.INPUT and cb.type == ConnectorType.OUTPUT:
+            out_attr, in_attr = b, a
+        elif cb.type == ConnectorType.INPUT and ca.type == ConnectorType.OUTPUT:
+            out_attr, in_attr = a, b
+        else:
+            # ungültige Paarung (z.B. input-input oder output-output) überspringen
+            return
 
-        # Restore connections from flow._connections (set[frozenset])
-        for pair in self.flow._connections:
-            # pair ist ein frozenset mit genau zwei connector-uuids
-            a, b = tuple(pair)
+        self.links[pair] = dpg.add_node_link(connector_tag(out_attr), connector_tag(in_attr), parent=self.editor_tag)
+
+    def visible_region(self) -> tuple[float, float, float, float]:
+        """Canvas rectangle (x0, y0, x1, y1) covered by the node editor."""
+        # dpg has no panning API: the offset between screen and canvas
+        # position of any rendered node gives it
+        for uuid in self.ui_nodes:
+            tag = node_tag(uuid)
+            state = dpg.get_item_state(tag)
+            canvas = dpg.get_item_pos(tag)
+            screen = state.get("rect_min")
+            if canvas and screen and state.get("rect_size", (0, 0))[0] > 0:
+                self._pan = (screen[0] - canvas[0], screen[1] - canvas[1])
+            break
+
+        x, y = dpg.get_item_rect_min(self.editor_tag) or (0, 0)
+        w, h = dpg.get_item_rect_size(self.editor_tag) or (0, 0)
+        if not w or not h:
+            w, h = dpg.get_viewport_width(), dpg.get_viewport_height()
+
+        return (x - self._pan[0], y - self._pan[1], x + w - self._pan[0], y + h - self._pan[1])
+
+    def update_view(self):
+        """Build UI items for nodes near the visible canvas and drop those far from it."""
+        x0, y0, x1, y1 = self.visible_region()
+        ex, ey = NODE_EXTENT
+
+        wanted = self.grid.query(x0 - VIEW_MARGIN - ex, y0 - VIEW_MARGIN - ey, x1 + VIEW_MARGIN, y1 + VIEW_MARGIN)
+
+        # never remove every node, a shown node is needed to follow the panning
+        if not wanted:
+            return
 
-            ca = self.flow._find_connector(a)
-            cb = self.flow._find_connector(b)
+        far = 2 * VIEW_MARGIN
+        keep = self.grid.query(x0 - far - ex, y0 - far - ey, x1 + far, y1 + far)
+        for uuid in [uuid for uuid in self.ui_nodes if uuid not in keep]:
+            self.dematerialize(uuid)
 
-            # beide Connector-Objekte müssen vorhanden sein
-            if ca is None or cb is None:
+        built = 0
+        for uuid in wanted:
+            if built >= BUILD_PER_FRAME:
+                break
+            if uuid in self.ui_nodes:
                 continue
 
-            # bestimme Richtung: add_node_link(output_attr, input_attr, ...)
-            if ca.type == ConnectorType.INPUT and cb.type == ConnectorType.OUTPUT:
-                out_attr = cb.uuid
-                in_attr = ca.uuid
-            elif cb.type == ConnectorType.INPUT and ca.type == ConnectorType.OUTPUT:
-                out_attr = ca.uuid
-                in_attr = cb.uuid
-            else:
-                # ungültige Paarung (z.B. input-input oder output-output) überspringen
+            node = self.flow.get_node(uuid)
+            if node is not None:
+                self.materialize(node)
+                built += 1
+
+    def sync_positions(self):
+        """Store canvas positions of moved nodes in the flow."""
+        # not while dragging, every frame would end up in the journal
+        if dpg.is_mouse_button_down(dpg.mvMouseButton_Left):
+            return
+
+        for uuid, ui_node in self.ui_nodes.items():
+            pos = dpg.get_item_pos(node_tag(uuid))
+            if not pos:
                 continue
 
-            dpg.add_node_link(out_attr, in_attr, parent=self.editor_tag)
-    
+            pos = [float(pos[0]), float(pos[1])]
+            if pos != ui_node._data.pos:
+                self.flow.update_node(ui_node._data, pos=pos)
+                self.grid.insert(uuid, *pos)
+
+    def runtime_id(self, item: int | str) -> str | int | None:
+        """Runtime uuid of a dpg item (id or alias) created for a node or connector."""
+        alias = item if isinstance(item, str) else dpg.get_item_alias(item)
+        return self.tags.get(alias)
 
     def key_handler(self, sender, app_data):
         # Provide a functionality for adding a new node
@@ -136,32 +301,161 @@ class NodeEditor:
             dpg.focus_item(self.create_node_input_tag)
 
         # Delete selected nodes
-        if app_data == dpg.mvKey_Delete:
+        if app_data == dpg.mvKey_Delete and not self.busy("delete"):
             nodes = dpg.get_selected_nodes(self.editor_tag) or []
             links = dpg.get_selected_links(self.editor_tag) or []
 
-            # Dann die selektierten Nodes löschen
-            for node in nodes:
-                self.flow.remove_node_by_id(node)
-                dpg.delete_item(node)
-
+            # Dann die selektierten Nodes löschen, als ein batch im Flow
+            removed = []
+            with self.flow.batch():
+                for node in nodes:
+                    uuid = self.runtime_id(node)
+                    if uuid is not None:
+                        self.flow.remove_node_by_id(uuid)
+                        removed.append(uuid)
+
+            # UI erst anpassen, wenn der batch erfolgreich war
+            for uuid in removed:
+                self.grid.remove(uuid)
+                self.states.pop(uuid, None)
+                self.diagnostics.pop(uuid, None)
+                self.edits.pop(uuid, None)
+                self.dematerialize(uuid)
+
+            # links of deleted nodes are already gone
             for link in links:
-                self.unlink(sender=None, app_data=link)
+                if dpg.does_item_exist(link):
+                    self.unlink(sender=None, app_data=link)
 
         if app_data == dpg.mvKey_S and dpg.is_key_down(dpg.mvKey_LControl):
-            print("Saved")
-            self.flow.save()
+            if self.runner is None or not self.runner.running:
+                self.store_edits()
+            try:
+                self.flow.commit()
+            except OSError as err:
+                print("Cannot save flow:", err)
+            else:
+                print("Saved")
 
         if app_data == dpg.mvKey_F5:
-            self.flow.run()
+            self.run()
+
+        # Cancel a running flow between two nodes
+        if app_data == dpg.mvKey_Escape and self.runner is not None:
+            self.runner.cancel()
+
+    def edit_code(self, node: NodeData, code: str):
+        """Store the text of a node's code box in the flow and compile it in the background."""
+        self.compiler.submit(node, code)
+        if self.runner is not None and self.runner.running:
+            # the run reads the code from its thread
+            self.edits[node.uuid] = (node, code)
+            return
+        self.flow.update_node(node, code=code, compile=False)
+
+    def store_edits(self):
+        """Hand edits made during a background run to the flow."""
+        edits, self.edits = self.edits, {}
+        for node, code in edits.values():
+            if self.flow._node_index.get(node.uuid) is node:
+                self.flow.update_node(node, code=code, compile=False)
+
+    def apply_compiled(self, results: list[CompileResult]):
+        """Show the diagnostics of compiled edits, the flow has their text already."""
+        for result in results:
+            node = result.node
+            if self.flow._node_index.get(node.uuid) is not node:
+                # deleted while it was compiled
+                self.compiler.discard(node)
+                continue
+
+            if result.ok:
+                # the code object is in the code cache, the node finds it when it runs
+                self.diagnostics.pop(node.uuid, None)
+            else:
+                assert result.diagnostic is not None
+                self.diagnostics[node.uuid] = result.diagnostic
+
+            ui_node = self.ui_nodes.get(node.uuid)
+            if ui_node is not None:
+                ui_node.set_diagnostic(result.diagnostic)
+
+    def run(self):
+        if self.runner is not None and self.runner.running:
+            return
+
+        # edits still waiting for the debounce delay belong to this run
+        self.store_edits()
+        self.apply_compiled(self.compiler.flush())
+
+        try:
+            self.flow.plan()
+        except FlowCycleError as err:
+            print("Cannot run flow:", err)
+            return
+
+        self.states.clear()
+        for ui_node in self.ui_nodes.values():
+            ui_node.set_state("")
+
+        # the render loop keeps going, progress arrives through poll()
+        self.runner = BackgroundRun(self.flow, incremental=True).start()
+
+    def poll(self):
+        """Per frame work: virtualize the canvas, apply finished compiles and progress of a background run."""
+        self.sync_positions()
+        self.update_view()
+        if self.runner is None or not self.runner.running:
+            # edits and finished compiles are kept until the run is over
+            self.store_edits()
+            self.apply_compiled(self.compiler.poll())
+
+        if self.runner is None:
+            return
+
+        for event in self.runner.poll():
+            if event.node is not None:
+                self.states[event.node.uuid] = event.kind
+                ui_node = self.ui_nodes.get(event.node.uuid)
+                if ui_node is not None:
+                    ui_node.set_state(event.kind)
+            elif event.kind == RunEvent.FINISHED:
+                print("Cached nodes:", [node.uuid for node in self.flow.cache_hits])
+                for conflict in self.flow.conflicts:
+                    print("Conflict:", conflict)
+            elif event.kind == RunEvent.CANCELLED:
+                print("Run cancelled")
+            elif event.kind == RunEvent.ERROR:
+                print("Run failed:", event.error)
+
+    def busy(self, action: str) -> bool:
+        """
+        True while a background run uses the flow. The run reads the
+        topology and code of the flow from its worker thread, so edits of
+        them are refused until it finished; code edits wait in `edits`.
+        """
+        if self.runner is None or not self.runner.running:
+            return False
+        print(f"Cannot {action} while the flow is running, press Escape to cancel the run")
+        return True
 
     def link(self, sender, app_data):
+        if self.busy("link"):
+            return
+
         # Connect nodes
-        self.flow.connect(app_data[0], app_data[1])
-        dpg.add_node_link(app_data[0], app_data[1], parent=sender)
+        a, b = self.runtime_id(app_data[0]), self.runtime_id(app_data[1])
+        if a is None or b is None:
+            return
+
+        self.flow.connect(a, b)
+        self.links[frozenset({a, b})] = dpg.add_node_link(app_data[0], app_data[1], parent=sender)
 
 
     def unlink(self, sender, app_data):
+        if self.busy("unlink"):
+            return
+
         # get link info
         cfg = dpg.get_item_configuration(app_data)
         start_attr = cfg["attr_1"]
@@ -174,7 +468,10 @@ class NodeEditor:
         if start_node is None or end_node is None:
             return
 
-        # Übergib die Attribut-UUIDs an die Flow-Logik (nicht Node-Tags)
-        self.flow.disconnect(start_attr, end_attr)
+        # Übergib die Connector-UUIDs an die Flow-Logik (nicht die dpg-Tags)
+        a, b = self.runtime_id(start_attr), self.runtime_id(end_attr)
+        if a is not None and b is not None:
+            self.flow.disconnect(a, b)
+            self.links.pop(frozenset({a, b}), None)
         dpg.delete_item(app_data)
 
@@ -1,22 +1,80 @@
 from nython.core.runtime.node import NodeData
 
+from typing import TYPE_CHECKING, Callable
+
 import dearpygui.dearpygui as dpg
 
+if TYPE_CHECKING:
+    from nython.core.runtime.compiler import Diagnostic
+
+STATE_COLORS = {
+    "running": (99, 179, 237, 255),
+    "done": (104, 211, 145, 255),
+    "failed": (245, 101, 101, 255),
+    "cached": (160, 170, 180, 255),
+}
+
+def node_tag(uuid: str | int) -> str:
+    # runtime uuids are mapped to dpg aliases, so they never collide with items dpg numbers itself
+    return f"node:{uuid}"
+
+def connector_tag(uuid: str | int) -> str:
+    return f"conn:{uuid}"
+
 class IMGuiNode:
-    def __init__(self, parent: str | int, node: NodeData) -> None:
+    def __init__(self, parent: str | int, node: NodeData, on_code: Callable[[NodeData, str], None] | None = None,
+                 code: str | None = None) -> None:
         self._imgui_parent = parent
         self._data: NodeData = node
 
+        # text of the code box, the node's code unless an edit is not stored yet
+        self._code: str = node.code if code is None else code
+
+        # lets the flow record code changes, e.g. in its journal
+        self._on_code = on_code
+
+        self._status_tag: int | str | None = None
+        self._diagnostic_tag: int | str | None = None
+
     def code_changed(self, sender, app_data):
-        self._data.set_code(app_data)
+        if self._on_code is not None:
+            self._on_code(self._data, app_data)
+        else:
+            self._data.set_code(app_data)
+
+    def tags(self) -> dict[str, str | int]:
+        """dpg alias -> runtime uuid for the node and its connectors."""
+        result: dict[str, str | int] = {node_tag(self._data.uuid): self._data.uuid}
+        for conn in (self._data.inputs + self._data.outputs):
+            result[connector_tag(conn.uuid)] = conn.uuid
+        return result
+
+    def set_state(self, state: str):
+        """Show the execution state (running, done, failed, cached) below the title."""
+        if self._status_tag is None:
+            return
+        dpg.set_value(self._status_tag, state)
+        dpg.configure_item(self._status_tag, color=STATE_COLORS.get(state, (160, 170, 180, 255)))
+
+    def set_diagnostic(self, diagnostic: "Diagnostic | None"):
+        """Show why the edited code does not compile, None hides it."""
+        if self._diagnostic_tag is None:
+            return
+        dpg.set_value(self._diagnostic_tag, "" if diagnostic is None else str(diagnostic))
+        dpg.configure_item(self._diagnostic_tag, show=diagnostic is not None)
 
     def show(self):
         # TODO: Construct dynamic nodes based on the connector types or something else
-        with dpg.node(label=self._data.title, parent=self._imgui_parent, tag=self._data.uuid):
+        pos = self._data.pos if self._data.pos is not None else []
+        with dpg.node(label=self._data.title, parent=self._imgui_parent, tag=node_tag(self._data.uuid), pos=pos):
+            with dpg.node_attribute(attribute_type=dpg.mvNode_Attr_Static):
+                self._status_tag = dpg.add_text("")
+
             for input in self._data.inputs:
-                with dpg.node_attribute(label="Node A1", tag=input.uuid, attribute_type=dpg.mvNode_Attr_Input):
+                with dpg.node_attribute(label="Node A1", tag=connector_tag(input.uuid), attribute_type=dpg.mvNode_Attr_Input):
                     dpg.add_input_float(label="Input", width=150)
 
             for output in self._data.outputs:
-                with dpg.node_attribute(label="Node A2", tag=output.uuid, attribute_type=dpg.mvNode_Attr_Output):
-                    dpg.add_input_text(label="Code", width=150, multiline=True, callback=self.code_changed, default_value=self._data.code)
+                with dpg.node_attribute(label="Node A2", tag=connector_tag(output.uuid), attribute_type=dpg.mvNode_Attr_Output):
+                    dpg.add_input_text(label="Code", width=150, multiline=True, callback=self.code_changed, default_value=self._code)
+                    self._diagnostic_tag = dpg.add_text("", wrap=150, show=False, color=STATE_COLORS["failed"])
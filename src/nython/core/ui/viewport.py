@@ -0,0 +1,101 @@
+from nython.core.runtime.flow import Flow, FlowCycleError
+
+from typing import Hashable, Iterable
+
+# Platz pro Node beim automatischen Layout
+LAYOUT_SPACING = (320.0, 220.0)
+
+
+class SpatialGrid:
+    """
+    Uniform grid over canvas positions, used to find the nodes in a region.
+
+    Each key lives in exactly one cell, so insert, move and remove are O(1)
+    and a query touches only the cells overlapping the region.
+    """
+
+    def __init__(self, cell: float = 512.0) -> None:
+        self.cell: float = cell
+        self._cells: dict[tuple[int, int], set[Hashable]] = {}
+        self._where: dict[Hashable, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _key(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.cell), int(y // self.cell)
+
+    def insert(self, item: Hashable, x: float, y: float):
+        """Insert or move `item` to the position (x, y)."""
+        cell = self._key(x, y)
+        old = self._where.get(item)
+        if old == cell:
+            return
+        if old is not None:
+            self._discard(item, old)
+
+        self._cells.setdefault(cell, set()).add(item)
+        self._where[item] = cell
+
+    def remove(self, item: Hashable):
+        cell = self._where.pop(item, None)
+        if cell is not None:
+            self._discard(item, cell)
+
+    def _discard(self, item: Hashable, cell: tuple[int, int]):
+        items = self._cells[cell]
+        items.discard(item)
+        if not items:
+            del self._cells[cell]
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> set[Hashable]:
+        """Items whose cell overlaps the region, may include a few just outside of it."""
+        cx0, cy0 = self._key(x0, y0)
+        cx1, cy1 = self._key(x1, y1)
+
+        result: set[Hashable] = set()
+
+        # weit herausgezoomt: die belegten Zellen durchgehen statt der Region
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            for (cx, cy), items in self._cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    result |= items
+            return result
+
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                items = self._cells.get((cx, cy))
+                if items:
+                    result |= items
+        return result
+
+
+def auto_layout(flow: Flow, spacing: tuple[float, float] = LAYOUT_SPACING) -> int:
+    """
+    Give every node without a canvas position one, return their number.
+
+    Nodes are placed in columns by their depth in the execution order, so
+    links point from left to right. Flows with a cycle are laid out as a
+    square grid in insertion order instead.
+    """
+    unplaced = [node for node in flow._nodes if node.pos is None]
+    if not unplaced:
+        return 0
+
+    try:
+        order: Iterable = flow.plan()
+        depth: dict = {}
+        for node in order:
+            depth[node] = max((depth[p] + 1 for p in flow.predecessors(node)), default=0)
+    except FlowCycleError:
+        columns = max(1, int(len(flow._nodes) ** 0.5))
+        depth = {node: i % columns for i, node in enumerate(flow._nodes)}
+
+    rows: dict[int, int] = {}
+    for node in unplaced:
+        column = depth[node]
+        row = rows.get(column, 0)
+        rows[column] = row + 1
+        node.pos = [column * spacing[0], row * spacing[1]]
+
+    return len(unplaced)
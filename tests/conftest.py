@@ -0,0 +1,19 @@
+import os
+
+# set before nython is imported, the suite must not write to ~/.cache/nython
+os.environ["NYTHON_NO_BYTECODE_CACHE"] = "1"
+
+from nython.core.runtime.flow import Flow  # noqa: E402
+from nython.core.runtime.node import NodeData  # noqa: E402
+
+
+def link(flow: Flow, a: NodeData, b: NodeData):
+    flow.connect(a.outputs[0].uuid, b.inputs[0].uuid)
+
+
+def chain(*codes: str) -> tuple[Flow, list[NodeData]]:
+    flow = Flow()
+    nodes = [flow.create_node(f"n{i}", code) for i, code in enumerate(codes)]
+    for a, b in zip(nodes, nodes[1:]):
+        link(flow, a, b)
+    return flow, nodes
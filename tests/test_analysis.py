@@ -0,0 +1,85 @@
+import pytest
+
+from conftest import link
+from nython.core.runtime.analysis import symbols_of
+from nython.core.runtime.flow import Flow
+
+
+def test_reads_and_writes():
+    symbols = symbols_of("import os\ny = a + b\ndef f():\n    return c\nclass K:\n    z = d")
+    assert symbols.reads >= {"a", "b", "c", "d"}
+    assert symbols.writes == {"os", "y", "f", "K"}
+    assert not symbols.dynamic
+
+
+def test_augmented_assignment_and_del_read():
+    assert "x" in symbols_of("x += 1").reads
+    assert "x" in symbols_of("del x").reads
+    assert "x" in symbols_of("def f():\n    global x\n    x += 1").reads
+
+
+def test_dynamic_code():
+    assert symbols_of("y = eval('x')").dynamic
+    assert symbols_of("from os import *").dynamic
+
+
+def test_inputs_merged_from_all_predecessors():
+    flow = Flow()
+    a, b = flow.create_node("a", "x = 1\nshared = [1]"), flow.create_node("b", "y = 2\nshared = [2]")
+    c = flow.create_node("c", "z = x + y + shared[0]")
+    link(flow, a, c)
+    link(flow, b, c)
+
+    executed = flow.run()
+    assert executed[c][1]["z"] == 4
+    assert [(conflict.name, conflict.sources) for conflict in flow.conflicts] == [("shared", [a, b])]
+
+
+def test_upstream_reads():
+    assert symbols_of("shared = 3\nprint(shared)").upstream == {"print"}
+    assert symbols_of("shared = shared + 1").upstream == {"shared"}
+    assert symbols_of("shared += 1").upstream == {"shared"}
+    assert "shared" in symbols_of("if c:\n    shared = 3\nprint(shared)").upstream
+    assert "shared" in symbols_of("def f():\n    return shared\nshared = 3").upstream
+
+
+@pytest.mark.parametrize("prune", [False, True])
+def test_no_conflict_for_names_bound_before_reading(prune):
+    flow = Flow()
+    a, b = flow.create_node("a", "shared = 1"), flow.create_node("b", "shared = 2")
+    c = flow.create_node("c", "shared = 3\nout = shared")
+    link(flow, a, c)
+    link(flow, b, c)
+
+    executed = flow.run(prune=prune)
+    assert executed[c][1]["out"] == 3
+    assert flow.conflicts == []
+
+
+def test_prune_passes_names_used_by_augmented_assignment_and_del():
+    flow = Flow()
+    a, b = flow.create_node("a", "x = 1"), flow.create_node("b", "y = 2")
+    c = flow.create_node("c", "x += 1\ny += 1")
+    link(flow, a, c)
+    link(flow, b, c)
+    d = flow.create_node("d", "del x")
+    link(flow, c, d)
+
+    executed = flow.run(prune=True)
+    assert executed[c][1]["x"] == 2 and executed[c][1]["y"] == 3
+    assert "x" not in executed[d][1]
+
+
+def test_prune_drops_unread_names():
+    flow = Flow()
+    nodes = [flow.create_node(f"n{i}", code)
+             for i, code in enumerate(["big = bytearray(10)\nx = 1", "y = x + 1", "z = y + 1"])]
+    for a, b in zip(nodes, nodes[1:]):
+        link(flow, a, b)
+    # a second successor keeps the first node out of the fused chain
+    link(flow, nodes[0], flow.create_node("side", "w = x"))
+
+    for options in ({}, {"fuse": True}, {"fuse": True, "incremental": True}):
+        executed = flow.run(prune=True, **options)
+        assert executed[nodes[-1]][1]["z"] == 3
+        assert "big" not in executed[nodes[-1]][1]
@@ -0,0 +1,54 @@
+import io
+import json
+
+import pytest
+
+from conftest import chain
+from nython.core.runtime import binformat
+from nython.core.runtime.flow import Flow
+from nython.core.runtime.node import NodeData
+
+
+def sample() -> Flow:
+    flow, nodes = chain("x = 1", "y = 'äöü ' * x", "z = y")
+    nodes[0].pos = [10.0, -2.5]
+    # ids outside of i64 and string ids
+    node = NodeData.from_dict({"uuid": 2**70, "name": "big", "code": "w = 1",
+                               "inputs": [{"uuid": "in"}], "outputs": [{"uuid": "out"}]})
+    flow.add_node(node)
+    return flow
+
+
+def test_binary_round_trip(tmp_path):
+    flow = sample()
+    path = str(tmp_path / ("flow" + binformat.SUFFIX))
+    flow.save(path)
+    assert binformat.is_binary(path)
+
+    loaded = Flow.load(path, recover=False)
+    assert [node.to_dict() for node in loaded._nodes] == [node.to_dict() for node in flow._nodes]
+    assert loaded.run()[loaded.get_node(flow._nodes[2].uuid)][1]["z"] == "äöü "
+
+
+def test_convert_to_json_and_back(tmp_path):
+    flow = sample()
+    binary, text, again = (str(tmp_path / name) for name in ("a.nyb", "b.json", "c.nyb"))
+    flow.save(binary)
+    binformat.convert(binary, text)
+    with open(text) as file:
+        assert json.load(file) == [node.to_dict() for node in flow._nodes]
+
+    binformat.convert(text, again)
+    with open(binary, "rb") as a, open(again, "rb") as c:
+        assert a.read() == c.read()
+
+
+def test_truncated_file_is_rejected():
+    out = io.BytesIO()
+    binformat.write_nodes(out, sample()._nodes)
+    data = out.getvalue()
+
+    with pytest.raises(binformat.FormatError):
+        list(binformat.iter_nodes(io.BytesIO(data[:-3])))
+    with pytest.raises(binformat.FormatError):
+        list(binformat.iter_nodes(io.BytesIO(b"{}")))
@@ -0,0 +1,28 @@
+import os
+
+from nython.core.runtime.codecache import CodeCache
+
+
+def test_disk_tier_is_pruned_least_recently_used_first(tmp_path):
+    cache = CodeCache(tmp_path)
+    for i in range(20):
+        cache.compile(f"x = {i}\n" + "y = 1\n" * 50)
+    files = sorted(tmp_path.glob("*/*.bin"), key=lambda p: p.stat().st_mtime)
+    size = sum(p.stat().st_size for p in files)
+
+    # the oldest file was read recently and survives
+    os.utime(files[0], (files[-1].stat().st_mtime + 10,) * 2)
+    kept = files[0]
+
+    removed = cache.prune(size // 2)
+    remaining = list(tmp_path.glob("*/*.bin"))
+    assert removed > 0
+    assert sum(p.stat().st_size for p in remaining) <= size // 2 * 3 // 4
+    assert kept in remaining
+
+
+def test_pruned_entries_are_compiled_again(tmp_path):
+    cache = CodeCache(tmp_path, max_disk_bytes=0)
+    code = cache.compile("x = 1")
+    cache.clear()
+    assert cache.compile("x = 1").co_code == code.co_code
@@ -0,0 +1,45 @@
+from multiprocessing import shared_memory
+
+import pytest
+
+from nython.core.runtime import dataplane
+from nython.core.runtime.dataplane import DataPlane, SharedValue
+
+
+def exists(name: str) -> bool:
+    try:
+        shared_memory.SharedMemory(name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_large_values_are_exported_and_freed():
+    with DataPlane(threshold=1024) as plane:
+        exported = plane.export_namespace({"small": b"x", "big": bytearray(b"ab" * 1024)})
+        handle = exported["big"]
+        assert exported["small"] == b"x"
+        assert isinstance(handle, SharedValue)
+
+        view = dataplane.view(handle)
+        assert bytes(view[:2]) == b"ab"
+
+        plane.retain({"big": view})
+        plane.release({"big": view})
+        assert plane.segments == 0
+        assert not exists(handle.name)
+
+        # the mapping outlives the segment while the view is referenced
+        assert bytes(view[:2]) == b"ab"
+        del view
+        dataplane.release_local()
+        assert not dataplane._local.lingering
+
+
+def test_close_unlinks_every_segment():
+    plane = DataPlane(threshold=16)
+    handle = plane.export(b"0123456789" * 4)
+    assert exists(handle.name)
+    plane.close()
+    assert not exists(handle.name)
+    assert plane.segments == 0
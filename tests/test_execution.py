@@ -0,0 +1,104 @@
+import asyncio
+import gc
+import tracemalloc
+
+import pytest
+
+from conftest import chain, link
+from nython.core.runtime.flow import Flow
+from nython.core.runtime.profiling import RunHook
+
+
+# downstream node code reading x = 5 from nested scopes, and the y it computes
+NESTED = [
+    ("def f():\n    return x\ny = f()", 5),
+    ("y = sum(x * i for i in range(3))", 15),
+    ("g = lambda v: v * x\ny = g(1)", 5),
+    ("y = [x for _ in range(1)][0]", 5),
+    ("class K:\n    v = x\ny = K.v", 5),
+    ("class K:\n    def m(self):\n        return x\ny = K().m()", 5),
+]
+
+
+@pytest.mark.parametrize("code, expected", NESTED)
+@pytest.mark.parametrize("options", [{}, {"parallel": True}, {"fuse": True}, {"prune": True}])
+def test_nested_scopes_see_upstream_names(code, expected, options):
+    flow, nodes = chain("x = 5", code)
+    executed = flow.run(**options)
+    assert executed[nodes[-1]][1]["y"] == expected
+
+
+@pytest.mark.parametrize("code, expected", NESTED)
+def test_nested_scopes_see_upstream_names_async(code, expected):
+    flow, nodes = chain("x = 5", code)
+    executed = asyncio.run(flow.arun())
+    assert executed[nodes[-1]][1]["y"] == expected
+
+
+def test_functions_passed_downstream_keep_their_names():
+    flow, nodes = chain("x = 2\ndef f(v):\n    return v * x", "y = f(3)")
+    assert flow.run()[nodes[-1]][1]["y"] == 6
+
+
+def test_upstream_namespace_is_not_modified():
+    flow, nodes = chain("x = 1", "x = 2\ndel x", "y = x if 'x' in dir() else None")
+    executed = flow.run()
+    assert executed[nodes[0]][1]["x"] == 1
+    assert "x" not in executed[nodes[1]][1]
+
+
+def test_release_frees_shadowed_values():
+    size = 1_000_000
+    flow, nodes = chain(*[f"big = bytearray({size})"] * 100)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        executed = flow.run(release=True)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert list(executed) == [nodes[-1]]
+    # a bounded number of buffers, not one per node of the chain
+    assert retained < 20 * size
+
+
+class Recorder(RunHook):
+    def __init__(self) -> None:
+        self.done: list = []
+
+    def after(self, node, result, error):
+        if error is None:
+            self.done.append(node)
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_parallel_error_stops_only_the_failed_branch(processes):
+    flow = Flow()
+    root = flow.create_node("root", "x = 1")
+    failing = flow.create_node("failing", "y = x / 0")
+    child = flow.create_node("child", "z = y")
+    other = flow.create_node("other", "w = x + 1")
+    link(flow, root, failing)
+    link(flow, failing, child)
+    link(flow, root, other)
+
+    recorder = Recorder()
+    flow.hooks.append(recorder)
+    with pytest.raises(ZeroDivisionError):
+        flow.run(parallel=True, processes=processes, workers=2)
+    assert set(recorder.done) == {root, other}
+
+
+def test_parallel_run_matches_sequential_run():
+    flow = Flow()
+    root = flow.create_node("root", "x = 2")
+    branches = [flow.create_node(f"b{i}", f"y{i} = x * {i}") for i in range(4)]
+    sink = flow.create_node("sink", "total = y0 + y1 + y2 + y3")
+    for branch in branches:
+        link(flow, root, branch)
+        link(flow, branch, sink)
+
+    assert flow.run(parallel=True)[sink][1]["total"] == flow.run()[sink][1]["total"] == 12
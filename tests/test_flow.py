@@ -0,0 +1,112 @@
+import pytest
+
+from conftest import link
+from nython.core.runtime.flow import Flow, FlowCycleError
+from nython.core.runtime.node import NodeData
+
+
+def test_links_update_the_adjacency():
+    flow = Flow()
+    a, b, c = (flow.create_node(name) for name in "abc")
+    link(flow, a, b)
+    link(flow, a, c)
+    assert flow.successors(a) == [b, c]
+    assert flow.predecessors(b) == [a]
+
+    flow.disconnect(a.outputs[0].uuid, b.inputs[0].uuid)
+    assert flow.successors(a) == [c]
+    assert flow.predecessors(b) == []
+
+
+def test_removing_a_node_drops_its_links_on_both_sides():
+    flow = Flow()
+    a, b = flow.create_node("a"), flow.create_node("b")
+    link(flow, a, b)
+    flow.remove_node(b)
+
+    assert flow.get_node(b.uuid) is None
+    assert flow.successors(a) == []
+    assert a.outputs[0].connections == set()
+    assert not flow._edges
+
+
+def test_link_listed_on_one_side_is_resolved_when_the_other_node_is_added():
+    sink = NodeData.from_dict({"uuid": 4, "code": "", "inputs": [{"uuid": 5, "connections": [3]}],
+                               "outputs": [{"uuid": 6}]})
+    source = NodeData.from_dict({"uuid": 1, "code": "", "inputs": [{"uuid": 2}], "outputs": [{"uuid": 3}]})
+    flow = Flow()
+    flow.add_node(sink)
+    assert flow.predecessors(sink) == []
+
+    flow.add_node(source)
+    assert flow.predecessors(sink) == [source]
+    assert flow.get_node(1) is source
+
+
+def test_plan_breaks_ties_by_insertion_order():
+    flow = Flow()
+    a, b, c, d = (flow.create_node(name) for name in "abcd")
+    link(flow, c, a)
+    link(flow, b, d)
+    assert flow.plan() == [b, c, a, d]
+
+
+def test_plan_is_cached_until_the_topology_changes():
+    flow = Flow()
+    a, b = flow.create_node("a"), flow.create_node("b")
+    first = flow.plan()
+    assert flow.plan() is first
+
+    link(flow, b, a)
+    assert flow.plan() == [b, a]
+
+
+def test_cycle_is_reported_with_its_nodes():
+    flow = Flow()
+    a, b, c = (flow.create_node(name) for name in "abc")
+    link(flow, a, b)
+    link(flow, b, c)
+    link(flow, c, b)
+
+    with pytest.raises(FlowCycleError) as info:
+        flow.plan()
+    assert set(info.value.nodes) == {b, c}
+    with pytest.raises(FlowCycleError):
+        flow.run()
+
+
+def test_failed_batch_is_rolled_back():
+    flow = Flow()
+    a, b, c = (flow.create_node(name, f"{name} = 1") for name in "abc")
+    link(flow, a, b)
+    link(flow, b, c)
+    before = [node.to_dict() for node in flow._nodes]
+
+    with pytest.raises(RuntimeError):
+        with flow.batch():
+            flow.remove_node(b)
+            flow.set_code(a, "a = 2")
+            d = flow.create_node("d")
+            link(flow, a, d)
+            raise RuntimeError("abort")
+
+    assert [node.to_dict() for node in flow._nodes] == before
+    assert flow.get_node(d.uuid) is None
+    assert flow.plan() == [a, b, c]
+    assert flow.predecessors(c) == [b]
+
+
+def test_batch_journals_its_records_when_it_completes(tmp_path):
+    flow = Flow()
+    nodes = [flow.create_node(f"n{i}") for i in range(3)]
+    flow.attach_journal(str(tmp_path / "flow.journal"), fsync=False)
+
+    with flow.batch():
+        with flow.batch():
+            flow.remove_node(nodes[0])
+        flow.remove_node(nodes[1])
+        assert flow.journal.pending == 0
+        assert nodes[0] in flow._nodes
+
+    assert flow.journal.pending == 2
+    assert flow._nodes == nodes[2:]
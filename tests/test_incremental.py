@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+from conftest import chain
+from nython.core.runtime.cache import ResultCache, deep_size
+
+
+def test_unchanged_nodes_are_served_from_the_cache():
+    flow, nodes = chain("x = 1", "y = x + 1", "z = y + 1")
+    flow.run(incremental=True)
+
+    flow.set_code(nodes[2], "z = y + 2")
+    executed = flow.run(incremental=True)
+    assert flow.cache_hits == nodes[:2]
+    assert executed[nodes[2]][1]["z"] == 4
+
+
+def test_mutating_an_inherited_value_does_not_change_the_cache():
+    flow, nodes = chain("lst = []", "lst.append(1)\nn = len(lst)")
+    assert flow.run(incremental=True)[nodes[1]][1]["n"] == 1
+
+    flow.set_code(nodes[1], "lst.append(1)\nn = len(lst)\nm = 0")
+    executed = flow.run(incremental=True)
+    assert flow.cache_hits == nodes[:1]
+    assert executed[nodes[1]][1]["n"] == 1
+
+
+def test_mutating_an_inherited_value_in_a_parallel_run():
+    flow, nodes = chain("lst = []", "lst.append(1)\nn = len(lst)")
+    flow.run(incremental=True, parallel=True)
+    flow.set_code(nodes[1], "lst.append(2)\nn = len(lst)")
+    assert flow.run(incremental=True, parallel=True)[nodes[1]][1]["n"] == 1
+
+
+def test_values_that_cannot_be_copied_are_not_cached():
+    flow, nodes = chain("import threading\nlock = threading.Lock()", "y = 1")
+    flow.run(incremental=True)
+    flow.run(incremental=True)
+    assert flow.cache_hits == nodes[1:]
+
+
+def test_fused_chain_does_not_reuse_the_entry_of_its_last_node():
+    flow, (a, b, c) = chain("x = 1", "y = x + 1", "z = y + 1")
+    d, e = flow.create_node("d", "w = x + z"), flow.create_node("e", "v = z")
+    for node in (d, e):
+        flow.connect(c.outputs[0].uuid, node.inputs[0].uuid)
+
+    flow.run(incremental=True)
+    flow.set_code(d, "w = x + z + 1")
+    executed = flow.run(incremental=True, fuse=True)
+    assert executed[d][1]["w"] == 5
+
+    flow.set_code(d, "w = x + z + 2")
+    executed = flow.run(incremental=True, fuse=True)
+    assert c in flow.cache_hits
+    assert executed[d][1]["w"] == 6
+
+
+@pytest.mark.parametrize("options", [{"parallel": True}, {"pool": object()}])
+def test_fuse_needs_a_sequential_run(options):
+    flow, _ = chain("x = 1", "y = x")
+    with pytest.raises(ValueError):
+        flow.run(fuse=True, **options)
+
+
+def test_results_above_the_budget_are_not_cached():
+    flow, nodes = chain("data = [[i] for i in range(100_000)]", "n = len(data)")
+    flow.results = ResultCache(budget=4 * 1024 * 1024)
+    flow.run(incremental=True)
+    assert len(flow.results) == 1
+
+    flow.run(incremental=True)
+    assert flow.cache_hits == nodes[1:]
+
+
+def test_deep_size_counts_nested_values():
+    namespace = {"data": [[i] for i in range(1000)]}
+    assert deep_size(namespace) > 1000 * sys.getsizeof([0])
+    assert 1024 < deep_size(namespace, limit=1024) < deep_size(namespace)
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from conftest import link
+from nython.core.runtime.flow import Flow
+
+
+@pytest.fixture
+def journaled(tmp_path) -> tuple[Flow, str]:
+    path = str(tmp_path / "flow.json")
+    flow = Flow()
+    flow.create_node("a", "x = 1")
+    flow.save(path)
+
+    flow.filename = path
+    flow.attach_journal(fsync=False)
+    return flow, path
+
+
+def test_edits_are_replayed_after_a_crash(journaled):
+    flow, path = journaled
+    a = flow._nodes[0]
+    b, c = flow.create_node("b", "y = x + 1"), flow.create_node("c", "")
+    link(flow, a, b)
+    flow.update_node(b, title="B", pos=[1.0, 2.0])
+    flow.remove_node(c)
+    flow.commit()
+
+    # only the journal was written, the snapshot still holds one node
+    loaded = Flow.load(path)
+    assert [node.title for node in loaded._nodes] == ["a", "B"]
+    assert loaded.get_node(b.uuid).pos == [1.0, 2.0]
+    assert loaded.run()[loaded.get_node(b.uuid)][1]["y"] == 2
+    assert len(Flow.load(path, recover=False)._nodes) == 1
+
+
+def test_torn_last_record_is_ignored(journaled):
+    flow, path = journaled
+    node = flow.create_node("b", "y = 1")
+    flow.commit()
+    with open(path + ".journal", "a") as file:
+        file.write('{"op": "remove_node", "uu')
+
+    assert Flow.load(path).get_node(node.uuid) is not None
+
+
+def test_journal_is_compacted_into_the_snapshot(journaled):
+    flow, path = journaled
+    flow.compact_after = 3
+    for i in range(3):
+        flow.create_node(f"n{i}")
+    flow.commit()
+
+    assert os.path.getsize(path + ".journal") == 0
+    assert flow.journal.records == 0
+    assert len(Flow.load(path, recover=False)._nodes) == 4
+
+
+def test_code_that_does_not_compile_is_journaled(journaled):
+    flow, path = journaled
+    node = flow._nodes[0]
+    flow.set_code(node, "x = (1", compile=False)
+    flow.commit()
+
+    loaded = Flow.load(path)
+    assert loaded.get_node(node.uuid).code == "x = (1"
+    with pytest.raises(SyntaxError):
+        loaded.run()
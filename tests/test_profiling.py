@@ -0,0 +1,17 @@
+from nython.core.runtime.flow import Flow
+from nython.core.runtime.profiling import Profiler
+
+
+def test_peak_alloc_is_relative_to_the_node_start():
+    flow = Flow()
+    big = flow.create_node("big", "data = bytearray(20 * 2**20)")
+    small = flow.create_node("small", "small = 1")
+    flow.connect(big.outputs[0].uuid, small.inputs[0].uuid)
+
+    profiler = Profiler(memory=True)
+    flow.hooks.append(profiler)
+    flow.run()
+
+    peaks = {p.title: p.peak_alloc for p in profiler.profiles}
+    assert peaks["big"] >= 20 * 2**20
+    assert peaks["small"] < 2**20
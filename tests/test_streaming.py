@@ -0,0 +1,33 @@
+import threading
+
+from nython.core.runtime.flow import Flow
+from nython.core.runtime.node import NodeData
+
+
+def stream(flow: Flow, timeout: float = 10) -> dict:
+    # a pipeline that never finishes must fail the test instead of hanging it
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(flow.stream(buffer=2)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not finish"
+    return result
+
+
+def test_items_pass_through_a_pipeline():
+    flow = Flow()
+    source = flow.create_node("source", "for i in range(10):\n    emit(i)")
+    sink = flow.create_node("sink", "total = sum(stream)")
+    flow.connect(source.outputs[0].uuid, sink.inputs[0].uuid)
+    assert stream(flow)[sink][1]["total"] == 45
+
+
+def test_link_listed_on_the_input_only():
+    source = NodeData.from_dict({"uuid": 1, "code": "for i in range(10):\n    emit(i)",
+                                 "inputs": [{"uuid": 2}], "outputs": [{"uuid": 3}]})
+    sink = NodeData.from_dict({"uuid": 4, "code": "total = sum(stream)",
+                               "inputs": [{"uuid": 5, "connections": [3]}], "outputs": [{"uuid": 6}]})
+    flow = Flow()
+    flow.add_node(source)
+    flow.add_node(sink)
+    assert stream(flow)[sink][1]["total"] == 45
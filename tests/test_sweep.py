@@ -0,0 +1,48 @@
+import itertools
+
+import pytest
+
+from conftest import chain
+from nython.core.runtime import sweep as sweeping
+from nython.core.runtime.sweep import sweep
+
+
+def squares():
+    flow, _ = chain("y = a * a", "z = 1 / y")
+    return flow
+
+
+def test_inline_sweep_reports_values_and_errors():
+    results = list(sweep(squares(), [{"a": 2}, {"a": 0}, {"a": 4}], processes=False))
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[0].values == {"a": 2, "y": 4, "z": 0.25}
+    assert not results[1].ok and "ZeroDivisionError" in results[1].error
+    assert results[2].values["z"] == 1 / 16
+
+
+def test_outputs_limit_the_collected_names():
+    results = list(sweep(squares(), [{"a": 2}], processes=False, outputs=["z"]))
+    assert results[0].values == {"z": 0.25}
+
+
+def test_process_sweep_streams_results_and_consumes_params_lazily():
+    consumed = 0
+
+    def params():
+        nonlocal consumed
+        for a in itertools.count(1):
+            consumed += 1
+            yield {"a": a}
+
+    results = sweep(squares(), params(), workers=2, outputs=["y"])
+    first = list(itertools.islice(results, 5))
+    results.close()
+
+    assert len(first) == 5
+    assert all(result.values["y"] == result.params["a"] ** 2 for result in first)
+    assert consumed <= 5 + 2 * sweeping.IN_FLIGHT_PER_WORKER
+
+
+def test_incremental_sweep_is_rejected():
+    with pytest.raises(ValueError):
+        list(sweep(squares(), [{"a": 1}], processes=False, incremental=True))